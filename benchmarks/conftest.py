@@ -0,0 +1,146 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.harness import Benchmark, compare, load_report
+
+BENCHMARK_KEY = pytest.StashKey()
+REGRESSIONS_KEY = pytest.StashKey()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks', 'Замеры представлений блога')
+    group.addoption('--bench-rounds', type=int, default=30)
+    group.addoption('--bench-warmup', type=int, default=3)
+    group.addoption('--bench-posts', type=int, default=2000)
+    group.addoption('--bench-comments', type=int, default=20000)
+    group.addoption('--bench-seed', type=int, default=1)
+    group.addoption(
+        '--bench-concurrency', type=int, default=16,
+        help='Число одновременных клиентов в замерах под нагрузкой.'
+    )
+    group.addoption(
+        '--bench-duration', type=float, default=3.0,
+        help='Длительность замеров SQLite под нагрузкой, с.'
+    )
+    group.addoption(
+        '--bench-output', default='benchmarks/results.json',
+        help='Куда записать результаты в формате JSON.'
+    )
+    group.addoption(
+        '--bench-baseline',
+        help='Сохранённые результаты для сравнения.'
+    )
+    group.addoption(
+        '--bench-tolerance', type=float, default=0.25,
+        help='Допустимый рост времени и размера ответа (доля).'
+    )
+
+
+def pytest_configure(config):
+    config.stash[BENCHMARK_KEY] = Benchmark(
+        rounds=config.getoption('bench_rounds'),
+        warmup=config.getoption('bench_warmup'),
+        meta={
+            'posts': config.getoption('bench_posts'),
+            'comments': config.getoption('bench_comments'),
+            'seed': config.getoption('bench_seed'),
+        },
+    )
+
+
+def pytest_sessionfinish(session):
+    benchmark = session.config.stash[BENCHMARK_KEY]
+    if not benchmark.results:
+        return
+    benchmark.write(session.config.getoption('bench_output'))
+    baseline = session.config.getoption('bench_baseline')
+    if baseline:
+        regressions = compare(
+            benchmark.results, load_report(baseline),
+            session.config.getoption('bench_tolerance'),
+        )
+        session.config.stash[REGRESSIONS_KEY] = regressions
+        if regressions:
+            session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    benchmark = config.stash[BENCHMARK_KEY]
+    if not benchmark.results:
+        return
+    terminalreporter.section('benchmarks')
+    sequential = {
+        name: result for name, result in benchmark.results.items()
+        if 'queries' in result
+    }
+    concurrent = {
+        name: result for name, result in benchmark.results.items()
+        if 'throughput_rps' in result
+    }
+    columns = ('p50_ms', 'p90_ms', 'p99_ms')
+    for results, extra in (
+            (sequential, ('queries', 'bytes')),
+            (concurrent, ('concurrency', 'throughput_rps'))):
+        if not results:
+            continue
+        terminalreporter.write_line(f'{"name":<32}' + ''.join(
+            f'{column:>15}' for column in columns + extra))
+        for name, result in results.items():
+            terminalreporter.write_line(f'{name:<32}' + ''.join(
+                f'{result[column]:>15}' for column in columns + extra))
+    regressions = config.stash.get(REGRESSIONS_KEY, [])
+    for line in regressions:
+        terminalreporter.write_line(f'REGRESSION {line}', red=True)
+
+
+@pytest.fixture(autouse=True)
+def disable_debug(settings):
+    settings.DEBUG = False
+
+
+@pytest.fixture(scope='session')
+def dataset(request, django_db_setup, django_db_blocker):
+    """Синтетические данные, общие для всех замеров сессии."""
+    from blog.dataset import DatasetGenerator
+    from blog.models import Post
+
+    options = request.config.getoption
+    posts = options('bench_posts')
+    with django_db_blocker.unblock():
+        DatasetGenerator(
+            users=max(posts // 20, 10), categories=20, locations=50,
+            posts=posts, comments=options('bench_comments'),
+            seed=options('bench_seed'), prefix='bench',
+        ).generate()
+        post = Post.objects.date_pub_filter().select_related(
+            'author', 'category'
+        ).order_by('-comment_count').first()
+    return SimpleNamespace(
+        post=post, author=post.author, category=post.category)
+
+
+@pytest.fixture
+def bench(request):
+    return request.config.stash[BENCHMARK_KEY]
+
+
+def _reload_urls():
+    import blog.urls
+    import blogicum.urls
+    from django.urls import clear_url_caches
+
+    importlib.reload(blog.urls)
+    importlib.reload(blogicum.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    """Асинхронные представления, как под ASGI (см. asgi.py)."""
+    settings.ASYNC_VIEWS = True
+    _reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    _reload_urls()
@@ -0,0 +1,145 @@
+"""Замеры представлений: перцентили времени, запросы и размер ответа."""
+import json
+import math
+import platform
+import statistics
+from time import perf_counter
+
+import django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def percentile(values, percent):
+    """Перцентиль методом ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def response_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def summarize(timings, queries, sizes):
+    timings = [seconds * 1000 for seconds in timings]
+    return {
+        'rounds': len(timings),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p90_ms': round(percentile(timings, 90), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'max_ms': round(max(timings), 3),
+        'queries': max(queries),
+        'bytes': max(sizes),
+    }
+
+
+def summarize_concurrent(latencies, elapsed, concurrency):
+    latencies = [seconds * 1000 for seconds in latencies]
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p90_ms': round(percentile(latencies, 90), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3),
+    }
+
+
+class Benchmark:
+    """Собирает результаты замеров за сессию."""
+
+    def __init__(self, rounds, warmup, meta=None):
+        self.rounds = rounds
+        self.warmup = warmup
+        self.meta = meta or {}
+        self.results = {}
+
+    def measure(self, name, request, setup=None, expected_status=200):
+        """Вызывает `request` нужное число раз и запоминает сводку.
+
+        `setup` выполняется перед каждым вызовом и в замер не входит.
+        """
+        timings, queries, sizes = [], [], []
+        for index in range(self.warmup + self.rounds):
+            if setup is not None:
+                setup()
+            with CaptureQueriesContext(connection) as context:
+                start = perf_counter()
+                response = request()
+                size = response_size(response)
+                elapsed = perf_counter() - start
+            assert response.status_code == expected_status, (
+                f'{name}: код ответа {response.status_code}, '
+                f'ожидался {expected_status}.'
+            )
+            if index >= self.warmup:
+                timings.append(elapsed)
+                queries.append(len(context))
+                sizes.append(size)
+        self.results[name] = summarize(timings, queries, sizes)
+        return self.results[name]
+
+    def measure_concurrent(self, name, run, concurrency):
+        """`run(concurrency)` возвращает задержки всех запросов."""
+        start = perf_counter()
+        latencies = run(concurrency)
+        elapsed = perf_counter() - start
+        self.results[name] = summarize_concurrent(
+            latencies, elapsed, concurrency)
+        return self.results[name]
+
+    def report(self):
+        return {
+            'meta': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'rounds': self.rounds,
+                'warmup': self.warmup,
+                **self.meta,
+            },
+            'results': self.results,
+        }
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(self.report(), stream, indent=2, ensure_ascii=False)
+
+
+def load_report(path):
+    with open(path, encoding='utf-8') as stream:
+        return json.load(stream)
+
+
+def compare(results, baseline, tolerance):
+    """Список регрессий относительно сохранённого базового отчёта.
+
+    Время и размер сравниваются с допуском `tolerance` (доля),
+    число запросов — строго. Метрики, которых нет в одном
+    из отчётов, пропускаются.
+    """
+    regressions = []
+    for name, base in baseline['results'].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        for metric in ('p50_ms', 'p90_ms', 'bytes', 'queries'):
+            if metric not in current or metric not in base:
+                continue
+            allowed = base[metric]
+            if metric != 'queries':
+                allowed *= 1 + tolerance
+            if current[metric] > allowed:
+                regressions.append(
+                    f'{name}: {metric} {current[metric]} > {base[metric]}')
+        if current.get('throughput_rps', 0) < base.get(
+                'throughput_rps', 0) / (1 + tolerance):
+            regressions.append(
+                f'{name}: throughput_rps {current["throughput_rps"]} '
+                f'< {base["throughput_rps"]}'
+            )
+    return regressions
@@ -0,0 +1,90 @@
+"""WSGI и ASGI под одновременной нагрузкой.
+
+WSGI: потоки с `Client`, как у многопоточного сервера. ASGI:
+корутины с `AsyncClient` в одном цикле событий; синхронная часть
+(запросы к базе) выполняется в одном потоке, как в Django 3.2.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def concurrency(request):
+    return request.config.getoption('bench_concurrency')
+
+
+@pytest.fixture
+def paths(dataset):
+    return {
+        'index': reverse('blog:index'),
+        'detail': reverse('blog:post_detail', args=(dataset.post.id,)),
+    }
+
+
+def wsgi_runner(path, per_client):
+    def client_requests(_):
+        client = Client()
+        latencies = []
+        for _ in range(per_client):
+            start = perf_counter()
+            response = client.get(path)
+            latencies.append(perf_counter() - start)
+            assert response.status_code == 200
+        connections.close_all()
+        return latencies
+
+    def run(concurrency):
+        with ThreadPoolExecutor(concurrency) as pool:
+            return [
+                latency
+                for latencies in pool.map(
+                    client_requests, range(concurrency))
+                for latency in latencies
+            ]
+    return run
+
+
+def asgi_runner(path, per_client):
+    async def client_requests(client):
+        latencies = []
+        for _ in range(per_client):
+            start = perf_counter()
+            response = await client.get(path)
+            latencies.append(perf_counter() - start)
+            assert response.status_code == 200
+        return latencies
+
+    async def run_all(concurrency):
+        results = await asyncio.gather(*(
+            client_requests(AsyncClient()) for _ in range(concurrency)))
+        return [latency for latencies in results for latency in latencies]
+
+    return async_to_sync(run_all)
+
+
+@pytest.mark.parametrize('page', ('index', 'detail'))
+def test_wsgi_under_load(bench, paths, concurrency, page):
+    cache.clear()
+    bench.measure_concurrent(
+        f'{page}_wsgi_concurrent',
+        wsgi_runner(paths[page], bench.rounds), concurrency,
+    )
+
+
+@pytest.mark.parametrize('page', ('index', 'detail'))
+def test_asgi_under_load(bench, paths, concurrency, async_views, page):
+    cache.clear()
+    bench.measure_concurrent(
+        f'{page}_asgi_concurrent',
+        asgi_runner(paths[page], bench.rounds), concurrency,
+    )
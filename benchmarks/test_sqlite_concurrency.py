@@ -0,0 +1,139 @@
+"""Чтение ленты во время записи комментариев: SQLite по умолчанию
+и с `SQLITE_PRAGMAS`.
+
+Замер идёт на отдельном файле базы через `sqlite3` в потоках, без
+Django: так видна именно блокировка читателей писателями.
+"""
+import sqlite3
+import threading
+from time import perf_counter, sleep
+
+import pytest
+from django.conf import settings
+
+from benchmarks.harness import summarize_concurrent
+from blog.sqlite import apply_pragmas
+
+POSTS = 5000
+READERS = 4
+WRITERS = 2
+# Столько же по умолчанию ждёт и Django (параметр `timeout`).
+CONNECT_TIMEOUT = 5
+FEED_SQL = '''
+    SELECT p.id, p.title, p.comment_count FROM post p
+    WHERE p.is_published AND p.pub_date <= ?
+    ORDER BY p.pub_date DESC, p.id DESC LIMIT 10
+'''
+COMMENT_SQL = 'INSERT INTO comment (post_id, text) VALUES (?, ?)'
+COUNT_SQL = (
+    'UPDATE post SET comment_count = comment_count + 1 WHERE id = ?')
+
+
+def create_database(path):
+    raw = sqlite3.connect(path)
+    raw.executescript('''
+        CREATE TABLE post (
+            id INTEGER PRIMARY KEY, title TEXT, text TEXT,
+            pub_date INTEGER, is_published BOOL, comment_count INTEGER
+        );
+        CREATE INDEX post_feed ON post (pub_date DESC, id DESC)
+            WHERE is_published;
+        CREATE TABLE comment (
+            id INTEGER PRIMARY KEY, post_id INTEGER, text TEXT
+        );
+    ''')
+    raw.executemany(
+        'INSERT INTO post VALUES (?, ?, ?, ?, 1, 0)',
+        ((i, f'Публикация {i}', 'текст ' * 50, i) for i in range(POSTS)),
+    )
+    raw.commit()
+    raw.close()
+
+
+def connect(path, pragmas):
+    raw = sqlite3.connect(
+        path, timeout=CONNECT_TIMEOUT, check_same_thread=False)
+    if pragmas:
+        apply_pragmas(raw, pragmas)
+    return raw
+
+
+class MixedLoad:
+    """Читатели ленты и писатели комментариев в отдельных потоках."""
+
+    def __init__(self, path, pragmas):
+        self.path = path
+        self.pragmas = pragmas
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.read_latencies = []
+        self.writes = 0
+        self.locked = 0
+
+    def attempt(self, raw, action):
+        try:
+            action(raw)
+        except sqlite3.OperationalError:
+            with self.lock:
+                self.locked += 1
+            return False
+        return True
+
+    def reader(self):
+        raw = connect(self.path, self.pragmas)
+        latencies = []
+        while not self.stop.is_set():
+            start = perf_counter()
+            if self.attempt(raw, self.read_feed):
+                latencies.append(perf_counter() - start)
+        raw.close()
+        with self.lock:
+            self.read_latencies.extend(latencies)
+
+    def writer(self, post_id):
+        raw = connect(self.path, self.pragmas)
+        while not self.stop.is_set():
+            if self.attempt(raw, lambda raw: self.comment(raw, post_id)):
+                with self.lock:
+                    self.writes += 1
+                post_id = (post_id + WRITERS) % POSTS
+        raw.close()
+
+    @staticmethod
+    def read_feed(raw):
+        raw.execute(FEED_SQL, (POSTS,)).fetchall()
+
+    @staticmethod
+    def comment(raw, post_id):
+        with raw:
+            raw.execute(COMMENT_SQL, (post_id, 'комментарий'))
+            raw.execute(COUNT_SQL, (post_id,))
+
+    def run(self, duration):
+        threads = [
+            threading.Thread(target=self.reader) for _ in range(READERS)]
+        threads += [
+            threading.Thread(target=self.writer, args=(number,))
+            for number in range(WRITERS)
+        ]
+        for thread in threads:
+            thread.start()
+        sleep(duration)
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        result = summarize_concurrent(
+            self.read_latencies, duration, READERS)
+        result['writes_per_s'] = round(self.writes / duration, 1)
+        result['locked_errors'] = self.locked
+        return result
+
+
+@pytest.mark.parametrize('profile', ('default', 'tuned'))
+def test_readers_while_writing(bench, tmp_path, request, profile):
+    path = tmp_path / 'bench.sqlite3'
+    create_database(path)
+    pragmas = settings.SQLITE_PRAGMAS if profile == 'tuned' else None
+    duration = request.config.getoption('bench_duration')
+    bench.results[f'sqlite_feed_while_writing_{profile}'] = MixedLoad(
+        path, pragmas).run(duration)
@@ -0,0 +1,100 @@
+from itertools import count
+
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def author_client(client, dataset):
+    client.force_login(dataset.author)
+    return client
+
+
+@pytest.fixture
+def urls(dataset):
+    post = dataset.post
+    return {
+        'index': reverse('blog:index'),
+        'profile': reverse('blog:profile', args=(dataset.author.username,)),
+        'category': reverse(
+            'blog:category_posts', args=(dataset.category.slug,)),
+        'detail': reverse('blog:post_detail', args=(post.id,)),
+        'create': reverse('blog:create_post'),
+        'edit': reverse('blog:edit_post', args=(post.id,)),
+        'comment': reverse('blog:add_comment', args=(post.id,)),
+    }
+
+
+@pytest.mark.parametrize('listing', ('index', 'profile', 'category'))
+def test_list_anonymous_cold(bench, client, urls, listing):
+    bench.measure(
+        f'{listing}_anonymous_cold', lambda: client.get(urls[listing]),
+        setup=cache.clear,
+    )
+
+
+@pytest.mark.parametrize('listing', ('index', 'profile', 'category'))
+def test_list_anonymous_cached(bench, client, urls, listing):
+    bench.measure(
+        f'{listing}_anonymous_cached', lambda: client.get(urls[listing]))
+
+
+@pytest.mark.parametrize('listing', ('index', 'profile', 'category'))
+def test_list_authenticated(bench, author_client, urls, listing):
+    bench.measure(
+        f'{listing}_authenticated', lambda: author_client.get(urls[listing]))
+
+
+def test_post_detail(bench, client, urls):
+    bench.measure('detail_anonymous', lambda: client.get(urls['detail']))
+
+
+def test_post_detail_authenticated(bench, author_client, urls):
+    bench.measure(
+        'detail_authenticated', lambda: author_client.get(urls['detail']))
+
+
+def test_post_create_flow(bench, author_client, dataset, urls):
+    numbers = count()
+
+    def create():
+        return author_client.post(urls['create'], {
+            'title': f'Замер {next(numbers)}',
+            'text': 'Текст публикации для замера.',
+            'pub_date': '2020-01-01T10:00',
+            'category': dataset.category.id,
+            'is_published': True,
+        })
+
+    bench.measure('create_form', lambda: author_client.get(urls['create']))
+    bench.measure('create_submit', create, expected_status=302)
+
+
+def test_post_edit_flow(bench, author_client, dataset, urls):
+    post = dataset.post
+    numbers = count()
+
+    def edit():
+        return author_client.post(urls['edit'], {
+            'title': f'{post.title} {next(numbers)}',
+            'text': post.text,
+            'pub_date': post.pub_date.strftime('%Y-%m-%dT%H:%M'),
+            'category': post.category_id,
+            'is_published': True,
+        })
+
+    bench.measure('edit_form', lambda: author_client.get(urls['edit']))
+    bench.measure('edit_submit', edit, expected_status=302)
+
+
+def test_comment_flow(bench, author_client, urls):
+    numbers = count()
+    bench.measure(
+        'comment_submit',
+        lambda: author_client.post(
+            urls['comment'], {'text': f'Комментарий {next(numbers)}'}),
+        expected_status=302,
+    )
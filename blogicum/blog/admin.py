@@ -1,8 +1,9 @@
 from django.contrib import admin
 
-from .models import Category, Location, Post, Comment
+from .models import Category, Location, Post, Comment, ImageJob
 
 admin.site.register(Category)
 admin.site.register(Location)
 admin.site.register(Post)
 admin.site.register(Comment)
+admin.site.register(ImageJob)
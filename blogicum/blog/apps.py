@@ -5,3 +5,11 @@ class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from django.conf import settings
+
+        from blog import signals  # noqa: F401
+        if getattr(settings, 'TEMPLATE_PROFILING', False):
+            from blog.template_profiler import install
+            install()
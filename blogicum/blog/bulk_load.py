@@ -0,0 +1,147 @@
+"""Потоковая загрузка дампов в формате `dumpdata` (JSON-массив)."""
+import json
+from collections import defaultdict
+
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connections
+
+JSON_CHUNK_SIZE = 1 << 16
+_SEPARATORS = ' \t\r\n,'
+
+
+def _skip_separators(buffer, pos):
+    while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+        pos += 1
+    return pos
+
+
+def _decode_items(decoder, buffer, final):
+    """Разбирает все целиком прочитанные элементы массива из буфера.
+
+    Возвращает элементы, позицию первого неразобранного символа и
+    признак того, что массив закрыт.
+    """
+    items = []
+    pos = 0
+    while True:
+        pos = _skip_separators(buffer, pos)
+        if pos == len(buffer):
+            return items, pos, False
+        if buffer[pos] == ']':
+            return items, pos, True
+        try:
+            item, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            # Элемент ещё не дочитан целиком.
+            return items, pos, False
+        items.append(item)
+
+
+def iter_json_array(stream, chunk_size=JSON_CHUNK_SIZE):
+    """Отдаёт элементы JSON-массива по одному, не читая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = stream.read(chunk_size).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError('Ожидался JSON-массив.')
+    buffer = buffer[1:]
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        items, pos, finished = _decode_items(decoder, buffer, not chunk)
+        yield from items
+        if finished:
+            return
+        if not chunk:
+            raise ValueError('Файл закончился раньше JSON-массива.')
+        buffer = buffer[pos:]
+
+
+def raw_insert(model, objs, using='default', ignore_conflicts=False):
+    """Вставляет объекты пачками как есть, без `pre_save` полей."""
+    if not objs:
+        return
+    connection = connections[using]
+    fields = [
+        field for field in model._meta.local_concrete_fields
+        if not (field.primary_key and getattr(objs[0], field.attname)
+                is None)
+    ]
+    size = max(connection.ops.bulk_batch_size(fields, objs), 1)
+    for start in range(0, len(objs), size):
+        # raw=True: те же правила, что у `loaddata` (без pre_save).
+        model._base_manager._insert(
+            objs[start:start + size], fields=fields, raw=True,
+            using=using, ignore_conflicts=ignore_conflicts,
+        )
+
+
+class BulkLoader:
+    """Копит объекты по моделям и вставляет их пачками.
+
+    Объекты вставляются как есть, без `save()` и сигналов; значения
+    `auto_now`/`auto_now_add` из дампа сохраняются, как в `loaddata`.
+    """
+
+    def __init__(self, batch_size, using='default', ignore_conflicts=False):
+        self.batch_size = batch_size
+        self.using = using
+        self.ignore_conflicts = ignore_conflicts
+        self.objects = defaultdict(list)
+        self.m2m = defaultdict(list)
+        self.models = set()
+        self.loaded = 0
+
+    def add(self, record):
+        for deserialized in serializers.deserialize(
+                'python', [record], using=self.using):
+            obj = deserialized.object
+            model = type(obj)
+            for field in model._meta.local_concrete_fields:
+                # Полей, добавленных позже дампа, в нём нет.
+                if (
+                    getattr(field, 'auto_now', False)
+                    or getattr(field, 'auto_now_add', False)
+                ) and getattr(obj, field.attname) is None:
+                    field.pre_save(obj, add=True)
+            self.models.add(model)
+            self.objects[model].append(obj)
+            for field_name, values in (deserialized.m2m_data or {}).items():
+                field = model._meta.get_field(field_name)
+                through = field.remote_field.through
+                self.m2m[through].extend(
+                    through(**{
+                        field.m2m_field_name(): obj,
+                        field.m2m_reverse_field_name(): value,
+                    })
+                    for value in values
+                )
+            if len(self.objects[model]) >= self.batch_size:
+                self.flush_model(model)
+
+    def _insert(self, model, objs):
+        raw_insert(
+            model, objs, using=self.using,
+            ignore_conflicts=self.ignore_conflicts,
+        )
+
+    def flush_model(self, model):
+        objs = self.objects.pop(model, [])
+        self._insert(model, objs)
+        self.loaded += len(objs)
+
+    def flush(self):
+        for model in list(self.objects):
+            self.flush_model(model)
+        for through in list(self.m2m):
+            self._insert(through, self.m2m.pop(through))
+
+    def reset_sequences(self):
+        connection = connections[self.using]
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(self.models))
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,110 @@
+from uuid import uuid4
+
+from django.core.cache import cache
+
+POST_CARD_TIMEOUT = 60 * 60
+POST_CARD_VERSION_KEY = 'post_card:version:{}'
+POST_CARDS_GENERATION_KEY = 'post_card:generation'
+
+PAGE_CACHE_TIMEOUT = 5 * 60
+PAGE_CACHE_KEY = 'page_cache:page:{}:{}:{}:{}'
+PAGE_CACHE_LISTING_KEY = 'page_cache:listing:{}'
+PAGE_CACHE_GENERATION_KEY = 'page_cache:generation'
+PAGE_CACHE_HITS_KEY = 'page_cache:hits'
+PAGE_CACHE_MISSES_KEY = 'page_cache:misses'
+
+
+def _post_card_version_key(post_id):
+    return POST_CARD_VERSION_KEY.format(post_id)
+
+
+def invalidate_post_card(post_id):
+    """Сбрасывает закэшированную карточку одного поста."""
+    cache.set(_post_card_version_key(post_id), uuid4().hex, None)
+
+
+def invalidate_post_cards():
+    """Сбрасывает все карточки: поменялись категория, место или автор."""
+    cache.set(POST_CARDS_GENERATION_KEY, uuid4().hex, None)
+
+
+def attach_card_cache_keys(posts):
+    """Проставляет постам `card_cache_key` одним запросом к кэшу."""
+    posts = list(posts)
+    versions = cache.get_many(
+        [_post_card_version_key(post.pk) for post in posts]
+        + [POST_CARDS_GENERATION_KEY]
+    )
+    generation = versions.get(POST_CARDS_GENERATION_KEY, '')
+    for post in posts:
+        post.card_cache_key = ':'.join(str(part) for part in (
+            post.pk,
+            post.updated_at.timestamp(),
+            post.comment_count,
+            versions.get(_post_card_version_key(post.pk), ''),
+            generation,
+        ))
+    return posts
+
+
+def _listing_key(listing):
+    return PAGE_CACHE_LISTING_KEY.format(listing)
+
+
+def post_listings(post):
+    """Страницы-списки, на которых может показываться пост."""
+    listings = ['index']
+    if post.category_id is not None:
+        listings.append(f'category:{post.category.slug}')
+    listings.append(f'profile:{post.author.username}')
+    return listings
+
+
+def invalidate_listings(listings):
+    cache.set_many(
+        {_listing_key(listing): uuid4().hex for listing in listings}, None
+    )
+
+
+def invalidate_all_pages():
+    cache.set(PAGE_CACHE_GENERATION_KEY, uuid4().hex, None)
+
+
+def page_cache_key(listing, request, params=''):
+    """Ключ страницы; `params` — уже проверенные параметры страницы."""
+    versions = cache.get_many(
+        [_listing_key(listing), PAGE_CACHE_GENERATION_KEY])
+    return PAGE_CACHE_KEY.format(
+        versions.get(_listing_key(listing), ''),
+        versions.get(PAGE_CACHE_GENERATION_KEY, ''),
+        request.path,
+        params,
+    )
+
+
+def _increment(key):
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, 1, None)
+
+
+def record_page_cache_hit(hit):
+    _increment(PAGE_CACHE_HITS_KEY if hit else PAGE_CACHE_MISSES_KEY)
+
+
+def page_cache_stats():
+    stats = cache.get_many([PAGE_CACHE_HITS_KEY, PAGE_CACHE_MISSES_KEY])
+    hits = stats.get(PAGE_CACHE_HITS_KEY, 0)
+    misses = stats.get(PAGE_CACHE_MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_page_cache_stats():
+    cache.delete_many([PAGE_CACHE_HITS_KEY, PAGE_CACHE_MISSES_KEY])
@@ -1,12 +1,38 @@
+from functools import partial, update_wrapper
+from time import perf_counter
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.shortcuts import redirect
 from django.views.generic import ListView
 from django.urls import reverse
 from django.contrib.auth.mixins import UserPassesTestMixin, LoginRequiredMixin
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
 from django.utils import timezone
 
+from blog.cache import (
+    PAGE_CACHE_TIMEOUT, POST_CARD_TIMEOUT, attach_card_cache_keys,
+    page_cache_key, record_page_cache_hit
+)
+from blog.image_jobs import enqueue_image
+from blog.middleware import query_wrappers
 from blog.models import Post, Comment
 from blog.forms import PostForm, CommentForm
+from blog.pagination import (
+    COMMENTS_KEYSET_ORDERING, InvalidCursor, KeysetPaginator,
+    POSTS_KEYSET_ORDERING, decode_cursor, encode_cursor
+)
+from blog.scheduler import expire_due_publications, expiry_pending
 
 POSTS_COUNT_ON_PAGE = 10
+COMMENTS_COUNT_ON_PAGE = 20
+# Сколько страниц по-прежнему отдаётся по старым ссылкам `?page=`
+# в режиме пагинации по ключу; дальние и `?page=last` перенаправляются
+# на курсор.
+OFFSET_PAGES_LIMIT = 5
 
 
 class PostMixin(LoginRequiredMixin):
@@ -20,6 +46,17 @@ class PostMixin(LoginRequiredMixin):
 class PostFormMixin:
     form_class = PostForm
 
+    def form_valid(self, form):
+        new_image = 'image' in form.changed_data and form.instance.image
+        if new_image:
+            form.instance.image_ready = False
+            form.instance.image_renditions = []
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if new_image:
+                enqueue_image(self.object)
+        return response
+
 
 class CommentMixin(LoginRequiredMixin):
     model = Comment
@@ -48,6 +85,12 @@ class UserCheck(UserPassesTestMixin):
         return self.request.user == self.get_object()
 
 
+class StaffCheck(UserPassesTestMixin):
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+
 class CommentCheck(UserPassesTestMixin):
 
     def test_func(self):
@@ -60,5 +103,232 @@ class CommentCheck(UserPassesTestMixin):
         )
 
 
-class PaginateByListView(ListView):
+class VisiblePostMixin:
+    """Пост со связями одним запросом; чужим — только опубликованный."""
+
+    model = Post
+    queryset = Post.objects.select_related('author', 'category', 'location')
+
+    def get_object(self, queryset=None):
+        post = super().get_object(queryset)
+        if self.request.user != post.author and not post.is_visible():
+            raise Http404('Публикация не найдена.')
+        return post
+
+
+class CommentsPageMixin:
+    comments_per_page = COMMENTS_COUNT_ON_PAGE
+
+    def get_comments_page(self, post, cursor=None):
+        paginator = KeysetPaginator(
+            post.comments.select_related('author'),
+            self.comments_per_page,
+            COMMENTS_KEYSET_ORDERING,
+        )
+        try:
+            return paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+
+
+def cached_page(key):
+    """Ответ из кэша страниц; попадание сразу учитывается."""
+    content = cache.get(key)
+    if content is None:
+        return None
+    record_page_cache_hit(True)
+    response = HttpResponse(content)
+    response['X-Page-Cache'] = 'HIT'
+    return response
+
+
+class AnonymousPageCacheMixin:
+    """Кэширует страницу целиком для анонимных посетителей."""
+
+    page_cache_listing = None
+
+    def get_page_cache_listing(self):
+        return self.page_cache_listing
+
+    def get_page_cache_params(self):
+        """Номер страницы и курсор для ключа кэша в каноническом виде.
+
+        None — страницу не кэшировать: иначе произвольные значения из
+        запроса плодили бы записи и вытесняли полезные.
+        """
+        params = []
+        page = self.request.GET.get('page')
+        if page is not None:
+            if not page.isdigit() or int(page) < 1:
+                return None
+            params.append(f'page={int(page)}')
+        cursor = self.request.GET.get('cursor')
+        if cursor is not None:
+            try:
+                cursor = encode_cursor(*decode_cursor(cursor))
+            except InvalidCursor:
+                return None
+            params.append(f'cursor={cursor}')
+        return '&'.join(params)
+
+    def dispatch(self, request, *args, **kwargs):
+        listing = self.get_page_cache_listing()
+        params = self.get_page_cache_params()
+        if (
+            listing is None
+            or params is None
+            or request.method != 'GET'
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        expire_due_publications()
+        key = page_cache_key(listing, request, params)
+        response = cached_page(key)
+        if response is not None:
+            return response
+        record_page_cache_hit(False)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response.content, PAGE_CACHE_TIMEOUT)
+            )
+        response['X-Page-Cache'] = 'MISS'
+        return response
+
+
+class PaginateByListView(AnonymousPageCacheMixin, ListView):
     paginate_by = POSTS_COUNT_ON_PAGE
+    keyset_pagination = False
+    keyset_ordering = POSTS_KEYSET_ORDERING
+    cursor_kwarg = 'cursor'
+
+    def get(self, request, *args, **kwargs):
+        if self.keyset_pagination:
+            url = self.get_keyset_redirect_url()
+            if url is not None:
+                return redirect(url)
+        return super().get(request, *args, **kwargs)
+
+    def is_offset_page(self, page):
+        return page.isdigit() and 0 < int(page) <= OFFSET_PAGES_LIMIT
+
+    def get_keyset_redirect_url(self):
+        """Адрес страницы по курсору для `?page=last` и дальних `?page=N`."""
+        page = self.request.GET.get(self.page_kwarg)
+        if page is None or self.is_offset_page(page):
+            return None
+        if page != 'last' and not (page.isdigit() and int(page) > 0):
+            raise Http404('Неверный номер страницы.')
+        queryset = self.get_queryset()
+        page_size = self.get_paginate_by(queryset)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        if page == 'last':
+            cursor = paginator.last_cursor()
+        else:
+            cursor = paginator.offset_cursor((int(page) - 1) * page_size)
+        params = self.request.GET.copy()
+        params.pop(self.page_kwarg)
+        params.pop(self.cursor_kwarg, None)
+        if cursor is not None:
+            params[self.cursor_kwarg] = cursor
+        if not params:
+            return self.request.path
+        return f'{self.request.path}?{params.urlencode()}'
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.keyset_pagination:
+            return super().paginate_queryset(queryset, page_size)
+        page = self.request.GET.get(self.page_kwarg)
+        if page is not None:
+            if not self.is_offset_page(page):
+                raise Http404('Используйте постраничную навигацию.')
+            # Тот же порядок, что и у курсоров: ссылки между режимами
+            # ведут на те же посты.
+            return super().paginate_queryset(
+                queryset.order_by(*self.keyset_ordering), page_size)
+        paginator = KeysetPaginator(queryset, page_size, self.keyset_ordering)
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('Неверный курсор страницы.')
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        attach_card_cache_keys(context['page_obj'])
+        context['post_card_timeout'] = POST_CARD_TIMEOUT
+        return context
+
+
+def _render_view(view, request, *args, **kwargs):
+    """Представление и отрисовка шаблона за один переход в поток."""
+    with query_wrappers(*getattr(request, 'query_wrappers', ())):
+        response = view(request, *args, **kwargs)
+        if not hasattr(response, 'render'):
+            return response
+        start = perf_counter()
+        response.render()
+    timings = getattr(request, 'timings', None)
+    if timings is not None:
+        timings.template += perf_counter() - start
+    # Готовый ответ без `render`, иначе обработчик Django снова
+    # отправит его в поток ради отрисовки.
+    rendered = HttpResponse(
+        response.content, status=response.status_code,
+        headers=response.headers,
+    )
+    rendered.cookies = response.cookies
+    return rendered
+
+
+class AsyncReadMixin:
+    """Асинхронная точка входа для страниц чтения под ASGI.
+
+    ORM в Django 3.2 синхронный, поэтому в цикле событий отдаются только
+    попадания в кэш страниц для анонимов: без сессии и без базы.
+    Остальное — представление вместе с отрисовкой — выполняется одним
+    переходом в поток. Включается `ASYNC_VIEWS = True` (см. asgi.py).
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        if not getattr(settings, 'ASYNC_VIEWS', False):
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            response = await cls.async_cached_page(
+                request, initkwargs, *args, **kwargs)
+            if response is None:
+                response = await sync_to_async(_render_view)(
+                    view, request, *args, **kwargs)
+            return response
+
+        return update_wrapper(async_view, view)
+
+    @classmethod
+    async def async_cached_page(cls, request, initkwargs, *args, **kwargs):
+        if (
+            not issubclass(cls, AnonymousPageCacheMixin)
+            or request.method != 'GET'
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+        ):
+            return None
+        lookup = partial(
+            cls.cached_page_lookup, request, initkwargs, *args, **kwargs)
+        if isinstance(caches['default'], LocMemCache):
+            return lookup()
+        # Сетевой кэш блокирует, а асинхронного API у кэша в 3.2 нет.
+        return await sync_to_async(lookup, thread_sensitive=False)()
+
+    @classmethod
+    def cached_page_lookup(cls, request, initkwargs, *args, **kwargs):
+        self = cls(**initkwargs)
+        self.setup(request, *args, **kwargs)
+        listing = self.get_page_cache_listing()
+        params = self.get_page_cache_params()
+        # Если подошло время отложенной публикации, нужна база.
+        if listing is None or params is None or expiry_pending():
+            return None
+        return cached_page(page_cache_key(listing, request, params))
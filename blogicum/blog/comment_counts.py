@@ -0,0 +1,14 @@
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recount_comments(post_queryset, comment_queryset):
+    """Пересчитывает `comment_count` одним UPDATE с подзапросом."""
+    counts = comment_queryset.filter(
+        post_cur=OuterRef('pk')
+    ).order_by().values('post_cur').annotate(
+        count=Count('pk')
+    ).values('count')
+    return post_queryset.update(
+        comment_count=Coalesce(Subquery(counts), 0)
+    )
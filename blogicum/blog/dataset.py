@@ -0,0 +1,158 @@
+"""Синтетические данные для воспроизведения планов запросов."""
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from blog.bulk_load import raw_insert
+from blog.cache import invalidate_all_pages, invalidate_post_cards
+from blog.comment_counts import recount_comments
+from blog.models import Category, Comment, Location, Post, User
+from blog.scheduler import NEXT_PUBLICATION_KEY
+from blog.search import get_search_backend
+
+WORDS = (
+    'город', 'река', 'утро', 'дорога', 'море', 'поезд', 'гора', 'кофе',
+    'книга', 'лес', 'вечер', 'мост', 'ветер', 'рынок', 'музей', 'парк',
+    'снег', 'озеро', 'площадь', 'маяк', 'сад', 'закат', 'остров', 'дом',
+    'старый', 'тихий', 'новый', 'дальний', 'светлый', 'холодный',
+    'увидел', 'прошёл', 'нашёл', 'вспомнил', 'снял', 'встретил',
+)
+HISTORY_DAYS = 3 * 365
+SCHEDULED_DAYS = 30
+SCHEDULED_SHARE = 0.03
+UNPUBLISHED_SHARE = 0.05
+HIDDEN_CATEGORY_SHARE = 0.1
+NO_LOCATION_SHARE = 0.3
+# Параметр Парето: при 1.16 на 20% авторов и постов приходится
+# около 80% публикаций и комментариев.
+PARETO_ALPHA = 1.16
+# Среднее время от публикации до комментария, в часах.
+COMMENT_DELAY_HOURS = 48
+
+
+class DatasetGenerator:
+    """Вставляет пачками пользователей, категории, места, посты
+    и комментарии с тяжёлым хвостом распределения.
+    """
+
+    def __init__(self, users=1000, categories=50, locations=200,
+                 posts=100000, comments=1000000, batch_size=5000,
+                 seed=None, prefix='load', log=None):
+        self.counts = {
+            User: users, Category: categories, Location: locations,
+            Post: posts, Comment: comments,
+        }
+        self.batch_size = batch_size
+        self.prefix = prefix
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def generate(self, index_search=True):
+        self.user_ids = self.create(User, self.build_user)
+        self.author_weights = self.heavy_tail(self.user_ids)
+        self.category_ids = self.create(Category, self.build_category)
+        self.location_ids = self.create(Location, self.build_location)
+        self.post_ids = self.create(Post, self.build_post)
+        self.post_weights = self.heavy_tail(self.post_ids)
+        self.create(Comment, self.build_comment)
+        self.finish(index_search)
+
+    def create(self, model, build):
+        """Создаёт объекты модели, возвращает id новых строк."""
+        total = self.counts[model]
+        last_id = model.objects.aggregate(last=Max('id'))['last'] or 0
+        for start in range(0, total, self.batch_size):
+            size = min(self.batch_size, total - start)
+            objs = [build(last_id + start + i + 1) for i in range(size)]
+            with transaction.atomic():
+                raw_insert(model, objs)
+            self.log(
+                f'{model._meta.verbose_name_plural}: {start + size}/{total}')
+        return list(
+            model.objects.filter(id__gt=last_id)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def heavy_tail(self, ids):
+        """Накопленные веса Парето для `random.choices`."""
+        return list(accumulate(
+            self.random.paretovariate(PARETO_ALPHA) for _ in ids))
+
+    def pick(self, ids, weights=None):
+        if weights is None:
+            return self.random.choice(ids)
+        return self.random.choices(ids, cum_weights=weights)[0]
+
+    def words(self, low, high):
+        return ' '.join(
+            self.random.choices(WORDS, k=self.random.randint(low, high)))
+
+    def past(self, days):
+        return self.now - timedelta(
+            minutes=self.random.randint(0, days * 24 * 60))
+
+    def build_user(self, number):
+        return User(
+            username=f'{self.prefix}_user_{number}', password='!',
+            email=f'{self.prefix}_user_{number}@example.com',
+            date_joined=self.past(HISTORY_DAYS),
+        )
+
+    def build_category(self, number):
+        return Category(
+            title=f'Категория {number}', slug=f'{self.prefix}-{number}',
+            description=self.words(5, 20),
+            is_published=self.random.random() >= HIDDEN_CATEGORY_SHARE,
+            created_at=self.now,
+        )
+
+    def build_location(self, number):
+        return Location(name=f'Место {number}', created_at=self.now)
+
+    def build_post(self, number):
+        if self.random.random() < SCHEDULED_SHARE:
+            pub_date = self.now + timedelta(
+                minutes=self.random.randint(1, SCHEDULED_DAYS * 24 * 60))
+        else:
+            pub_date = self.past(HISTORY_DAYS)
+        created_at = min(pub_date, self.now)
+        location_id = None
+        if self.location_ids and self.random.random() >= NO_LOCATION_SHARE:
+            location_id = self.pick(self.location_ids)
+        return Post(
+            title=self.words(2, 8).capitalize(),
+            text=self.words(20, 200),
+            pub_date=pub_date,
+            is_published=self.random.random() >= UNPUBLISHED_SHARE,
+            author_id=self.pick(self.user_ids, self.author_weights),
+            category_id=self.pick(self.category_ids),
+            location_id=location_id,
+            created_at=created_at,
+            updated_at=created_at,
+        )
+
+    def build_comment(self, number):
+        delay = timedelta(
+            hours=self.random.expovariate(1 / COMMENT_DELAY_HOURS))
+        return Comment(
+            text=self.words(3, 40),
+            post_cur_id=self.pick(self.post_ids, self.post_weights),
+            author_id=self.pick(self.user_ids, self.author_weights),
+            created_at=self.now - delay,
+        )
+
+    def finish(self, index_search):
+        self.log('Пересчёт счётчиков комментариев...')
+        recount_comments(Post.objects.all(), Comment.objects.all())
+        if index_search:
+            self.log('Перестроение поискового индекса...')
+            get_search_backend().rebuild()
+        invalidate_post_cards()
+        invalidate_all_pages()
+        cache.delete(NEXT_PUBLICATION_KEY)
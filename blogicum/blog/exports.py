@@ -0,0 +1,112 @@
+"""Потоковая выгрузка публикаций и комментариев."""
+import csv
+import json
+import zlib
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from blog.models import Comment, Post
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = ('jsonl', 'csv')
+EXPORTS = {
+    'post': (Post, 'pub_date', (
+        'id', 'title', 'text', 'pub_date', 'is_published', 'author_id',
+        'category_id', 'location_id', 'comment_count', 'created_at',
+    )),
+    'comment': (Comment, 'created_at', (
+        'id', 'post_cur_id', 'author_id', 'text', 'created_at',
+    )),
+}
+# Сжатый поток отдаётся кусками не меньше этого размера.
+GZIP_FLUSH_SIZE = 1 << 16
+
+
+class ExportError(ValueError):
+    pass
+
+
+def _parse_moment(value):
+    try:
+        moment = parse_datetime(value) or parse_date(value)
+    except ValueError:
+        # Формат верный, но такой даты нет: 2020-13-45.
+        moment = None
+    if moment is None:
+        raise ExportError(f'Неверная дата: {value}')
+    if not isinstance(moment, datetime):
+        moment = datetime.combine(moment, time.min)
+    # Границы без смещения задаются в часовом поясе сайта.
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(
+            moment, timezone.get_current_timezone(), is_dst=False)
+    return moment
+
+
+def export_rows(model_name, category=None, author=None, since=None,
+                until=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Возвращает имена полей и итератор по строкам выгрузки."""
+    if model_name not in EXPORTS:
+        raise ExportError(f'Неизвестная модель: {model_name}')
+    model, date_field, fields = EXPORTS[model_name]
+    post_prefix = '' if model is Post else 'post_cur__'
+    queryset = model.objects.order_by('pk')
+    if category:
+        queryset = queryset.filter(
+            **{f'{post_prefix}category__slug': category})
+    if author:
+        queryset = queryset.filter(author__username=author)
+    if since:
+        queryset = queryset.filter(
+            **{f'{date_field}__gte': _parse_moment(since)})
+    if until:
+        queryset = queryset.filter(
+            **{f'{date_field}__lt': _parse_moment(until)})
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    return fields, rows
+
+
+def iter_jsonl(fields, rows):
+    for row in rows:
+        yield json.dumps(
+            dict(zip(fields, row)), ensure_ascii=False, default=str) + '\n'
+
+
+class _Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def serialize(export_format, fields, rows):
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f'Неизвестный формат: {export_format}')
+    lines = iter_csv if export_format == 'csv' else iter_jsonl
+    return (line.encode() for line in lines(fields, rows))
+
+
+def gzip_stream(chunks):
+    """Сжимает поток байтов в формат gzip на лету."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            buffer.append(compressed)
+            size += len(compressed)
+        if size >= GZIP_FLUSH_SIZE:
+            yield b''.join(buffer)
+            buffer, size = [], 0
+    buffer.append(compressor.flush())
+    yield b''.join(buffer)
@@ -1,9 +1,17 @@
 from django import forms
+from django.core.validators import validate_image_file_extension
 
 from .models import Post, Comment, User
 
 
 class PostForm(forms.ModelForm):
+    # Фото проверяется только по расширению: декодирование и проверка
+    # содержимого выполняются в очереди обработки, а не в запросе.
+    image = forms.FileField(
+        label='Фото',
+        required=False,
+        validators=[validate_image_file_extension],
+    )
 
     class Meta:
         model = Post
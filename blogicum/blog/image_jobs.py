@@ -0,0 +1,142 @@
+"""Очередь обработки загруженных фото вне запроса."""
+import logging
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import UnidentifiedImageError
+
+from blog.cache import (
+    invalidate_listings, invalidate_post_card, post_listings
+)
+from blog.images import delete_renditions, make_renditions, normalize_image
+from blog.models import ImageJob, Post
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 3
+# Задачу, которую воркер взял и не закончил, считаем брошенной.
+STALE_AFTER = timedelta(minutes=10)
+
+
+def enqueue_image(post):
+    return ImageJob.objects.create(post=post)
+
+
+def claim_job():
+    """Берёт следующую задачу так, чтобы её не взял другой воркер."""
+    stale = timezone.now() - STALE_AFTER
+    abandoned = Q(status=ImageJob.PROCESSING, updated_at__lt=stale)
+    # Брошенная задача, исчерпавшая попытки, скорее всего роняет воркер
+    # (нехватка памяти, «бомба» распаковки) — больше её не берём.
+    for job in ImageJob.objects.filter(
+        abandoned, attempts__gte=MAX_ATTEMPTS
+    ):
+        failed = ImageJob.objects.filter(
+            pk=job.pk, status=job.status, updated_at=job.updated_at
+        ).update(
+            status=ImageJob.FAILED,
+            error='Обработка прервалась вместе с воркером.',
+            normalized_name='',
+            updated_at=timezone.now(),
+        )
+        if failed:
+            _discard_leftover(job)
+    candidates = ImageJob.objects.filter(
+        Q(status=ImageJob.PENDING)
+        | abandoned & Q(attempts__lt=MAX_ATTEMPTS)
+    ).order_by('created_at')
+    for job in candidates[:10]:
+        claimed = ImageJob.objects.filter(
+            pk=job.pk, status=job.status, updated_at=job.updated_at
+        ).update(
+            status=ImageJob.PROCESSING,
+            attempts=F('attempts') + 1,
+            normalized_name='',
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            _discard_leftover(job)
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def _finish(job, status, error=''):
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=status, error=error, normalized_name='',
+        updated_at=timezone.now()
+    )
+
+
+def _discard(image_name):
+    default_storage.delete(image_name)
+    delete_renditions(image_name)
+
+
+def _discard_leftover(job):
+    """Удаляет файл, оставшийся от попытки, которая не завершилась."""
+    if job.normalized_name and not Post.objects.filter(
+        pk=job.post_id, image=job.normalized_name
+    ).exists():
+        _discard(job.normalized_name)
+
+
+def process_job(job):
+    post = Post.objects.select_related('category', 'author').get(
+        pk=job.post_id)
+    if not post.image:
+        _finish(job, ImageJob.DONE)
+        return
+    image_name = post.image.name
+    normalized = None
+    try:
+        normalized = normalize_image(image_name)
+        ImageJob.objects.filter(pk=job.pk).update(normalized_name=normalized)
+        widths = make_renditions(normalized)
+    except UnidentifiedImageError as error:
+        # Файл не является картинкой: убираем его из публикации.
+        if normalized is not None:
+            _discard(normalized)
+        post.image.delete(save=False)
+        Post.objects.filter(pk=post.pk).update(
+            image='', image_ready=True, image_renditions=[])
+        _finish(job, ImageJob.FAILED, str(error))
+    except Exception as error:
+        if normalized is not None:
+            _discard(normalized)
+        if job.attempts >= MAX_ATTEMPTS:
+            _finish(job, ImageJob.FAILED, str(error))
+        else:
+            _finish(job, ImageJob.PENDING, str(error))
+        raise
+    else:
+        with transaction.atomic():
+            # Пока фото обрабатывалось, автор мог загрузить другое.
+            switched = Post.objects.filter(
+                pk=post.pk, image=image_name
+            ).update(
+                image=normalized, image_ready=True, image_renditions=widths)
+            _finish(job, ImageJob.DONE)
+        # Исходный файл удаляется, только когда пост уже указывает на новый.
+        _discard(image_name if switched else normalized)
+    invalidate_post_card(post.pk)
+    invalidate_listings(post_listings(post))
+
+
+def run_pending_jobs(limit=None):
+    """Обрабатывает задачи из очереди, возвращает число обработанных."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_job()
+        if job is None:
+            break
+        try:
+            process_job(job)
+        except Exception:
+            logger.exception(
+                'Не удалось обработать фото поста %s', job.post_id)
+        processed += 1
+    return processed
@@ -0,0 +1,84 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+RENDITION_WIDTHS = (320, 640, 1280)
+RENDITION_QUALITY = 80
+# Качество пересохранения оригинала: по умолчанию Pillow берёт 75.
+NORMALIZED_QUALITY = 95
+RENDITIONS_DIR = 'renditions'
+BACKGROUND = (255, 255, 255)
+
+
+def rendition_name(image_name, width):
+    path = PurePosixPath(image_name)
+    return str(path.parent / RENDITIONS_DIR / f'{path.stem}_{width}.jpg')
+
+
+def flatten(image):
+    """Переводит в RGB; прозрачное кладётся на белый фон, а не на чёрный."""
+    if image.mode == 'P' and 'transparency' in image.info:
+        image = image.convert('RGBA')
+    if image.mode not in ('RGBA', 'LA', 'PA'):
+        return image.convert('RGB')
+    image = image.convert('RGBA')
+    background = Image.new('RGB', image.size, BACKGROUND)
+    background.paste(image, mask=image.getchannel('A'))
+    return background
+
+
+def make_renditions(image_name, storage=default_storage):
+    """Создаёт уменьшенные копии фото, возвращает их ширины."""
+    with storage.open(image_name) as image_file:
+        image = Image.open(image_file)
+        image = flatten(ImageOps.exif_transpose(image))
+    widths = [width for width in RENDITION_WIDTHS if width < image.width]
+    for width in widths:
+        rendition = image.copy()
+        rendition.thumbnail((width, image.height), Image.Resampling.LANCZOS)
+        content = BytesIO()
+        rendition.save(
+            content, 'JPEG',
+            quality=RENDITION_QUALITY, optimize=True, progressive=True
+        )
+        name = rendition_name(image_name, width)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(content.getvalue()))
+    return widths
+
+
+def delete_renditions(image_name, storage=default_storage):
+    for width in RENDITION_WIDTHS:
+        name = rendition_name(image_name, width)
+        if storage.exists(name):
+            storage.delete(name)
+
+
+def rendition_urls(image_name, widths, storage=default_storage):
+    return [
+        (storage.url(rendition_name(image_name, width)), width)
+        for width in widths
+    ]
+
+
+def normalize_image(image_name, storage=default_storage):
+    """Декодирует фото, поворачивает по EXIF и сохраняет без EXIF рядом
+    с исходным. Возвращает имя нового файла, исходный не трогает.
+    """
+    with storage.open(image_name) as image_file:
+        image = Image.open(image_file)
+        image_format = image.format
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    options = {}
+    if image_format == 'JPEG':
+        image = image.convert('RGB')
+        options = {'quality': NORMALIZED_QUALITY}
+    content = BytesIO()
+    # Метаданные не передаются в save(), поэтому EXIF не сохраняется.
+    image.save(content, image_format, **options)
+    return storage.save(image_name, ContentFile(content.getvalue()))
@@ -0,0 +1,82 @@
+import gzip
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from blog.bulk_load import BulkLoader, iter_json_array
+from blog.cache import invalidate_all_pages, invalidate_post_cards
+from blog.comment_counts import recount_comments
+from blog.models import Comment, Post
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро загружает большой дамп в формате dumpdata (JSON-массив, '
+        'можно .gz): читает его потоково и вставляет записи пачками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('fixture', help='Путь к файлу дампа.')
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Сколько объектов одной модели вставлять за раз.'
+        )
+        parser.add_argument(
+            '--commit-every', type=int, default=50000,
+            help='Сколько записей загружать в одной транзакции.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать записи с уже существующими ключами.'
+        )
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, fixture, batch_size, commit_every, **options):
+        using = options['database']
+        loader = BulkLoader(batch_size, using, options['ignore_conflicts'])
+        opener = gzip.open if fixture.endswith('.gz') else open
+        start = perf_counter()
+        connection = connections[using]
+        # Как и loaddata, отключаем проверку внешних ключей: в дампе
+        # дочерние записи могут идти раньше родительских. Ссылки
+        # проверяются один раз в конце загрузки.
+        with connection.constraint_checks_disabled():
+            with opener(fixture, 'rt', encoding='utf-8') as stream:
+                self.load(loader, iter_json_array(stream), commit_every,
+                          using, start)
+        connection.check_constraints(
+            table_names=[model._meta.db_table for model in loader.models])
+        loader.reset_sequences()
+        self.stdout.write('Пересчёт счётчиков и поискового индекса...')
+        recount_comments(
+            Post.objects.using(using), Comment.objects.using(using))
+        get_search_backend().rebuild(using=using)
+        invalidate_post_cards()
+        invalidate_all_pages()
+        self.report(loader.loaded, start, final=True)
+
+    def load(self, loader, records, commit_every, using, start):
+        while True:
+            with transaction.atomic(using=using):
+                read = 0
+                for record in records:
+                    loader.add(record)
+                    read += 1
+                    if read == commit_every:
+                        break
+                loader.flush()
+            self.report(loader.loaded, start)
+            if read < commit_every:
+                return
+
+    def report(self, loaded, start, final=False):
+        elapsed = perf_counter() - start
+        rate = loaded / elapsed if elapsed else 0
+        message = (
+            f'Загружено объектов: {loaded} за {elapsed:.1f} с '
+            f'({rate:.0f} объектов/с)'
+        )
+        self.stdout.write(
+            self.style.SUCCESS(message) if final else message)
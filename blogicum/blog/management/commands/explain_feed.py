@@ -0,0 +1,53 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from blog.dataset import DatasetGenerator
+from blog.models import Category, Post, User
+
+SEED_AUTHORS = 100
+SEED_CATEGORIES = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Печатает планы (EXPLAIN) и время запросов ленты, категории '
+        'и профиля; при необходимости заполняет базу публикациями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Сколько публикаций создать перед замером.'
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, seed, batch_size, **options):
+        if seed:
+            self.seed(seed, batch_size)
+        category = Category.objects.filter(is_published=True).first()
+        author = User.objects.filter(posts__isnull=False).first()
+        if category is None or author is None:
+            self.stderr.write('В базе нет публикаций, используйте --seed.')
+            return
+        querysets = {
+            'Лента': Post.objects.date_pub_filter(),
+            'Категория': category.posts.date_pub_filter(),
+            'Профиль (чужой)': author.posts.date_pub_filter(),
+            'Профиль (свой)': author.posts.all(),
+        }
+        for title, queryset in querysets.items():
+            queryset = queryset.feed()[:10]
+            start = perf_counter()
+            list(queryset)
+            elapsed = (perf_counter() - start) * 1000
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f'{title}: {elapsed:.1f} мс'))
+            self.stdout.write(queryset.explain())
+
+    def seed(self, total, batch_size):
+        DatasetGenerator(
+            users=SEED_AUTHORS, categories=SEED_CATEGORIES, locations=0,
+            posts=total, comments=0, batch_size=batch_size,
+            prefix='explain', log=self.stdout.write,
+        ).generate()
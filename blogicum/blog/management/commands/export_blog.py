@@ -0,0 +1,57 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.exports import (
+    EXPORT_CHUNK_SIZE, EXPORT_FORMATS, EXPORTS, ExportError, export_rows,
+    gzip_stream, serialize
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает публикации или комментарии в JSON Lines или CSV '
+        'с постоянным расходом памяти.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=sorted(EXPORTS))
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='jsonl')
+        parser.add_argument('--category', help='Слаг категории.')
+        parser.add_argument('--author', help='Имя пользователя автора.')
+        parser.add_argument('--since', help='Начало периода (ISO 8601).')
+        parser.add_argument(
+            '--until', help='Конец периода, не включительно (ISO 8601).')
+        parser.add_argument(
+            '--gzip', action='store_true', help='Сжимать вывод gzip.')
+        parser.add_argument(
+            '--output', default='-', help='Файл вывода, «-» — stdout.')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, model, output, **options):
+        try:
+            fields, rows = export_rows(
+                model,
+                category=options['category'],
+                author=options['author'],
+                since=options['since'],
+                until=options['until'],
+                chunk_size=options['chunk_size'],
+            )
+            chunks = serialize(options['format'], fields, rows)
+        except ExportError as error:
+            raise CommandError(error)
+        if options['gzip']:
+            chunks = gzip_stream(chunks)
+        if output == '-':
+            self.write(chunks, sys.stdout.buffer)
+        else:
+            with open(output, 'wb') as stream:
+                self.write(chunks, stream)
+
+    def write(self, chunks, stream):
+        for chunk in chunks:
+            stream.write(chunk)
+        stream.flush()
@@ -0,0 +1,52 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.dataset import DatasetGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими пользователями, категориями, '
+        'местами, публикациями и комментариями для нагрузочных замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=50)
+        parser.add_argument('--locations', type=int, default=200)
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed', type=int, help='Зерно генератора случайных чисел.')
+        parser.add_argument(
+            '--prefix', default='load',
+            help='Префикс имён пользователей и слагов категорий.'
+        )
+        parser.add_argument(
+            '--skip-search-index', action='store_true',
+            help='Не перестраивать поисковый индекс.'
+        )
+
+    def handle(self, *args, skip_search_index, **options):
+        if options['posts'] and not (
+                options['users'] and options['categories']):
+            raise CommandError(
+                'Для публикаций нужны хотя бы один автор и одна категория.')
+        if options['comments'] and not options['posts']:
+            raise CommandError('Для комментариев нужны публикации.')
+        start = perf_counter()
+        DatasetGenerator(
+            users=options['users'],
+            categories=options['categories'],
+            locations=options['locations'],
+            posts=options['posts'],
+            comments=options['comments'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            prefix=options['prefix'],
+            log=self.stdout.write,
+        ).generate(index_search=not skip_search_index)
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово за {perf_counter() - start:.1f} с'))
@@ -0,0 +1,59 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog.cache import invalidate_all_pages, invalidate_post_cards
+from blog.images import make_renditions
+from blog.models import Post
+
+
+def _make_renditions(job):
+    pk, image_name = job
+    try:
+        return pk, make_renditions(image_name), None
+    except Exception as error:
+        return pk, None, error
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии фото для уже загруженных публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов (по умолчанию — по числу ядер).'
+        )
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересоздать копии и для уже обработанных фото.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, workers, batch_size, **options):
+        posts = Post.objects.exclude(image='')
+        if not options['all']:
+            posts = posts.filter(image_renditions=[])
+        jobs = posts.values_list('pk', 'image').iterator()
+        done = failed = 0
+        batch = []
+        with ProcessPoolExecutor(workers, initializer=django.setup) as pool:
+            for pk, widths, error in pool.map(
+                    _make_renditions, jobs, chunksize=16):
+                if error is not None:
+                    failed += 1
+                    self.stderr.write(f'Публикация {pk}: {error}')
+                    continue
+                batch.append(Post(pk=pk, image_renditions=widths))
+                if len(batch) >= batch_size:
+                    done += self.save(batch)
+                    batch = []
+            done += self.save(batch)
+        invalidate_post_cards()
+        invalidate_all_pages()
+        self.stdout.write(f'Обработано фото: {done}, с ошибками: {failed}')
+
+    def save(self, batch):
+        Post.objects.bulk_update(batch, ['image_renditions'])
+        return len(batch)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from blog.cache import page_cache_stats, reset_page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кэш страниц для анонимов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить счётчики.'
+        )
+
+    def handle(self, *args, reset, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["hit_ratio"]:.1%}'
+        )
+        if reset:
+            reset_page_cache_stats()
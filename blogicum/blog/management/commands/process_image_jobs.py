@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.image_jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Воркер очереди обработки загруженных фото.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Обработать очередь и выйти.'
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=2.0,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+
+    def handle(self, *args, once, sleep, **options):
+        while True:
+            processed = run_pending_jobs()
+            if processed:
+                self.stdout.write(f'Обработано фото: {processed}')
+            if once:
+                return
+            time.sleep(sleep)
@@ -0,0 +1,47 @@
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from blog.models import User
+from blog.template_profiler import (
+    RenderProfile, install, profile_rendering, uninstall
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает страницы и показывает время отрисовки каждого '
+        'шаблона, включения и тега {% url %}.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='Адреса страниц.')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument(
+            '--username', help='Запрашивать от имени пользователя.')
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш перед каждым запросом.'
+        )
+
+    def handle(self, *args, paths, repeat, username, cold, **options):
+        client = Client(SERVER_NAME='localhost')
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise CommandError(f'Нет пользователя {username}')
+            client.force_login(user)
+        install()
+        try:
+            for path in paths:
+                profile = RenderProfile()
+                with profile_rendering(profile):
+                    for _ in range(repeat):
+                        if cold:
+                            cache.clear()
+                        status = client.get(path).status_code
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{path} (код {status}, запросов: {repeat})'))
+                self.stdout.write(profile.format())
+        finally:
+            uninstall()
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.comment_counts import recount_comments
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Сколько публикаций обновлять в одной транзакции.'
+        )
+
+    def handle(self, *args, batch_size, **options):
+        updated = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                updated += recount_comments(
+                    Post.objects.filter(pk__in=pks), Comment.objects.all()
+                )
+            last_pk = pks[-1]
+        self.stdout.write(f'Обновлено публикаций: {updated}')
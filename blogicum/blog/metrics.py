@@ -0,0 +1,195 @@
+"""Сводные метрики запросов в текстовом формате Prometheus.
+
+Счётчики живут в памяти процесса: при нескольких воркерах каждый
+отдаёт свои значения, а складывает их сервер метрик.
+"""
+import threading
+from collections import defaultdict
+from time import perf_counter
+
+from blog.cache import page_cache_stats
+from blogicum.backends.sqlite3.pool import connection_stats
+from blog.write_queue import get_write_coordinator
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class RequestTimings:
+    """Замеры одного запроса, в секундах."""
+
+    def __init__(self):
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.total = 0.0
+        self.connect = 0.0
+        self.connect_saved = 0.0
+
+    @property
+    def view(self):
+        # SQL входит и во время представления, и во время шаблона,
+        # если запрос выполнился при отрисовке.
+        return max(self.total - self.template, 0.0)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql += perf_counter() - start
+
+    def record_connect(self, duration, saved):
+        self.connect += duration
+        self.connect_saved += saved
+
+    def server_timing(self):
+        return ', '.join((
+            f'sql;dur={self.sql * 1000:.1f};desc="{self.queries} queries"',
+            f'db-connect;dur={self.connect * 1000:.1f}',
+            f'view;dur={self.view * 1000:.1f}',
+            f'tpl;dur={self.template * 1000:.1f}',
+            f'total;dur={self.total * 1000:.1f}',
+        ))
+
+
+class ViewStats:
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.queries = 0
+        self.sql = 0.0
+        self.template = 0.0
+        self.view = 0.0
+        self.total = 0.0
+        self.connect = 0.0
+        self.connect_saved = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+
+_lock = threading.Lock()
+_stats = defaultdict(ViewStats)
+
+
+def record_request(view_name, timings, status_code):
+    with _lock:
+        stats = _stats[view_name or UNRESOLVED_VIEW]
+        stats.requests += 1
+        stats.errors += status_code >= 500
+        stats.queries += timings.queries
+        stats.sql += timings.sql
+        stats.template += timings.template
+        stats.view += timings.view
+        stats.total += timings.total
+        stats.connect += timings.connect
+        stats.connect_saved += timings.connect_saved
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if timings.total <= bound:
+                stats.buckets[index] += 1
+
+
+def reset_metrics():
+    with _lock:
+        _stats.clear()
+
+
+def _label(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+
+
+def _family(lines, name, kind, help_text):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {kind}')
+
+
+def render_metrics():
+    with _lock:
+        snapshot = sorted(
+            (view_name, vars(stats).copy())
+            for view_name, stats in _stats.items()
+        )
+    lines = []
+    counters = (
+        ('blog_requests_total', 'requests', 'Число запросов.'),
+        ('blog_request_errors_total', 'errors', 'Ответы с кодом 5xx.'),
+        ('blog_sql_queries_total', 'queries', 'Число SQL-запросов.'),
+        ('blog_sql_duration_seconds_total', 'sql', 'Время SQL-запросов.'),
+        ('blog_template_duration_seconds_total', 'template',
+         'Время отрисовки шаблонов.'),
+        ('blog_view_duration_seconds_total', 'view',
+         'Время работы представлений без отрисовки шаблонов.'),
+        ('blog_db_connect_duration_seconds_total', 'connect',
+         'Время открытия соединений с базой.'),
+        ('blog_db_connect_saved_seconds_total', 'connect_saved',
+         'Оценка времени, сэкономленного повторным использованием '
+         'соединений.'),
+    )
+    for name, field, help_text in counters:
+        _family(lines, name, 'counter', help_text)
+        for view_name, stats in snapshot:
+            lines.append(
+                f'{name}{{view="{_label(view_name)}"}} {stats[field]}')
+    name = 'blog_request_duration_seconds'
+    _family(lines, name, 'histogram', 'Полное время обработки запроса.')
+    for view_name, stats in snapshot:
+        label = f'view="{_label(view_name)}"'
+        for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+            lines.append(f'{name}_bucket{{{label},le="{bound}"}} {count}')
+        lines.append(
+            f'{name}_bucket{{{label},le="+Inf"}} {stats["requests"]}')
+        lines.append(f'{name}_sum{{{label}}} {stats["total"]}')
+        lines.append(f'{name}_count{{{label}}} {stats["requests"]}')
+    page_cache = page_cache_stats()
+    for key in ('hits', 'misses'):
+        name = f'blog_page_cache_{key}_total'
+        _family(lines, name, 'counter', 'Обращения к кэшу страниц.')
+        lines.append(f'{name} {page_cache[key]}')
+    _connection_metrics(lines, connection_stats())
+    coordinator = get_write_coordinator()
+    if coordinator is not None:
+        _write_queue_metrics(lines, coordinator.stats())
+    return '\n'.join(lines) + '\n'
+
+
+def _connection_metrics(lines, stats):
+    metrics = (
+        ('blog_db_connections_opened_total', 'counter', 'opened',
+         'Открытые новые соединения.'),
+        ('blog_db_connections_reused_total', 'counter', 'reused',
+         'Запросы, получившие уже открытое соединение.'),
+        ('blog_db_pool_idle', 'gauge', 'idle',
+         'Свободные соединения в пуле.'),
+        ('blog_db_pool_in_use', 'gauge', 'in_use',
+         'Выданные из пула соединения.'),
+    )
+    for name, kind, key, help_text in metrics:
+        _family(lines, name, kind, help_text)
+        for alias, item in sorted(stats.items()):
+            if key in item:
+                lines.append(f'{name}{{database="{_label(alias)}"}} '
+                             f'{item[key]}')
+
+
+def _write_queue_metrics(lines, stats):
+    metrics = (
+        ('blog_write_queue_depth', 'gauge', 'depth',
+         'Записи, ожидающие очереди.'),
+        ('blog_write_queue_max_depth', 'gauge', 'max_depth',
+         'Наибольшая длина очереди записи.'),
+        ('blog_write_queue_writes_total', 'counter', 'writes',
+         'Записи, прошедшие через очередь.'),
+        ('blog_write_queue_wait_seconds_total', 'counter', 'wait_seconds',
+         'Суммарное ожидание в очереди записи.'),
+        ('blog_write_queue_retries_total', 'counter', 'retries',
+         'Повторы транзакций из-за блокировки базы.'),
+        ('blog_write_queue_rejected_total', 'counter', 'rejected',
+         'Записи, отклонённые из-за переполнения очереди.'),
+    )
+    for name, kind, key, help_text in metrics:
+        _family(lines, name, kind, help_text)
+        lines.append(f'{name} {stats[key]}')
@@ -0,0 +1,204 @@
+import asyncio
+from contextlib import ExitStack, contextmanager
+from time import perf_counter, time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+from blog.metrics import RequestTimings, record_request
+from blog.nplusone import NPlusOneDetector
+from blog.routers import RoutingState, replica_aliases, routing_state
+from blog.write_queue import WriteQueueFull, get_write_coordinator
+from blogicum.backends.sqlite3.pool import connect_timings
+
+
+@contextmanager
+def query_wrappers(*wrappers):
+    """Подключает обёртки выполнения запросов ко всем соединениям."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            for wrapper in wrappers:
+                stack.enter_context(connection.execute_wrapper(wrapper))
+        yield
+
+
+@contextmanager
+def observe_connects(timings):
+    """Учитывает открытие соединений с базой в замерах запроса."""
+    token = connect_timings.set(timings)
+    try:
+        yield
+    finally:
+        connect_timings.reset(token)
+
+
+def add_query_wrapper(request, wrapper):
+    """Откладывает обёртку до перехода представления в поток.
+
+    Соединения с базой принадлежат потоку, поэтому под ASGI обёртку
+    нельзя подключить из цикла событий: её подключает асинхронное
+    представление там, где выполняются запросы (см. AsyncReadMixin).
+    """
+    request.query_wrappers = getattr(request, 'query_wrappers', ()) + (
+        wrapper,)
+
+
+class AsyncCapableMiddleware:
+    """Основа для middleware, которые работают и под WSGI, и под ASGI
+    без лишнего перехода в поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # Так Django понимает, что __call__ вернёт корутину.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class RequestMetricsMiddleware(AsyncCapableMiddleware):
+    """Считает SQL-запросы, время шаблонов и представления.
+
+    Итог отдаётся в заголовке `Server-Timing` и копится по имени
+    маршрута для `/metrics/`.
+    """
+
+    def __call__(self, request):
+        request.timings = RequestTimings()
+        if self.is_async:
+            return self.acall(request)
+        start = perf_counter()
+        with query_wrappers(request.timings), observe_connects(
+                request.timings):
+            response = self.get_response(request)
+        return self.finish(request, response, start)
+
+    async def acall(self, request):
+        start = perf_counter()
+        add_query_wrapper(request, request.timings)
+        # Контекст копируется в поток представления вместе с замерами.
+        with observe_connects(request.timings):
+            response = await self.get_response(request)
+        return self.finish(request, response, start)
+
+    def finish(self, request, response, start):
+        timings = request.timings
+        timings.total = perf_counter() - start
+        match = request.resolver_match
+        record_request(
+            match.view_name if match else None,
+            timings, response.status_code,
+        )
+        if getattr(settings, 'SERVER_TIMING', True):
+            response['Server-Timing'] = timings.server_timing()
+        return response
+
+    def process_template_response(self, request, response):
+        render = response.render
+        timings = request.timings
+
+        def timed_render():
+            start = perf_counter()
+            try:
+                return render()
+            finally:
+                timings.template += perf_counter() - start
+
+        response.render = timed_render
+        return response
+
+
+class NPlusOneMiddleware(AsyncCapableMiddleware):
+    """Ищет N+1 в каждом запросе, если задан `NPLUSONE_DETECTION`.
+
+    'log' пишет предупреждение, 'raise' прерывает запрос исключением.
+    """
+
+    def __call__(self, request):
+        mode = getattr(settings, 'NPLUSONE_DETECTION', None)
+        if not mode:
+            return self.get_response(request)
+        detector = NPlusOneDetector(mode)
+        if self.is_async:
+            add_query_wrapper(request, detector)
+            return self.get_response(request)
+        with query_wrappers(detector):
+            return self.get_response(request)
+
+
+class WriteCoordinatorMiddleware(AsyncCapableMiddleware):
+    """Отвечает 503, если запись не дождалась места в очереди.
+
+    Сама очередь работает на уровне SQL (см. blog.write_queue).
+    """
+
+    def __init__(self, get_response):
+        if get_write_coordinator() is None:
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, WriteQueueFull):
+            return None
+        response = HttpResponse(
+            'Сервер перегружен, повторите попытку.', status=503)
+        response['Retry-After'] = 1
+        return response
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """Привязывает чтение к основной базе на время после записи.
+
+    Срок хранится в cookie до конца сессии браузера, поэтому
+    отдельной записи в базу не требуется.
+    """
+
+    cookie_name = 'db_primary_until'
+
+    def __init__(self, get_response):
+        if not replica_aliases():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.acall(request)
+        token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(request, response)
+
+    async def acall(self, request):
+        token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(request, response)
+
+    def start(self, request):
+        try:
+            until = float(request.COOKIES.get(self.cookie_name, 0))
+        except ValueError:
+            until = 0
+        request.db_routing = RoutingState(sticky=until > time())
+        return routing_state.set(request.db_routing)
+
+    def finish(self, request, response):
+        if request.db_routing.wrote:
+            window = getattr(settings, 'REPLICA_STICKY_SECONDS', 10)
+            response.set_cookie(
+                self.cookie_name, str(int(time() + window)),
+                max_age=window, httponly=True, samesite='Lax',
+            )
+        return response
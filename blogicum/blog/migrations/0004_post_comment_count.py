@@ -0,0 +1,27 @@
+# Generated by Django 3.2.16 on 2023-11-20 12:10
+
+from django.db import migrations, models
+
+from blog.comment_counts import recount_comments
+
+
+def fill_comment_count(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    Comment = apps.get_model('blog', 'Comment')
+    recount_comments(Post.objects.all(), Comment.objects.all())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_rename_post_comment_post_cur'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество комментариев'),
+        ),
+        migrations.RunPython(fill_comment_count, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2023-11-27 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='image_renditions',
+            field=models.JSONField(default=list, editable=False, verbose_name='Ширины уменьшенных копий фото'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2023-12-04 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0009_post_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagejob',
+            name='normalized_name',
+            field=models.CharField(blank=True, max_length=255, verbose_name='Обработанный файл'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
 from blog.querysets import DatePubQuerySet
 
@@ -104,6 +105,25 @@ class Post(BasePostModel):
         upload_to='posts_images',
         blank=True
     )
+    image_ready = models.BooleanField(
+        default=True,
+        editable=False,
+        verbose_name='Фото обработано'
+    )
+    image_renditions = models.JSONField(
+        default=list,
+        editable=False,
+        verbose_name='Ширины уменьшенных копий фото'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
     objects = DatePubQuerySet.as_manager()
     object = DatePubQuerySet.as_manager()
 
@@ -112,10 +132,38 @@ class Post(BasePostModel):
         verbose_name_plural = 'Публикации'
         ordering = ('-pub_date',)
         default_related_name = 'posts'
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx'
+            ),
+            models.Index(
+                fields=('is_published', '-pub_date'),
+                name='post_is_published_pub_date_idx'
+            ),
+            models.Index(
+                fields=('category', '-pub_date'),
+                name='post_category_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date_idx'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    def is_visible(self):
+        """То же условие, что и `date_pub_filter()`, для одного поста."""
+        return (
+            self.is_published
+            and self.pub_date <= timezone.now()
+            and self.category is not None
+            and self.category.is_published
+        )
+
 
 class Comment(BaseModel):
     text = models.TextField('Текст комментария')
@@ -134,3 +182,59 @@ class Comment(BaseModel):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
         ordering = ('created_at',)
+
+
+class ImageJob(BaseModel):
+    PENDING = 'pending'
+    PROCESSING = 'processing'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'В очереди'),
+        (PROCESSING, 'Обрабатывается'),
+        (DONE, 'Готово'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Пост'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUSES,
+        default=PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    # Файл, который пишет текущая попытка: если воркер упадёт,
+    # следующая попытка удалит его.
+    normalized_name = models.CharField(
+        max_length=255,
+        blank=True,
+        verbose_name='Обработанный файл'
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено'
+    )
+
+    class Meta:
+        verbose_name = 'обработка фото'
+        verbose_name_plural = 'Обработка фото'
+        ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('status', 'created_at'),
+                name='imagejob_status_created_idx'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.post_id}: {self.get_status_display()}'
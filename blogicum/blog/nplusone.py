@@ -0,0 +1,101 @@
+"""Поиск N+1: одинаковых SELECT, повторяющихся в одном запросе."""
+import logging
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 5
+IN_LIST_RE = re.compile(r'IN \((?:%s, )*%s\)')
+SPACES_RE = re.compile(r'\s+')
+# Обёртки запросов и middleware — не место вызова.
+INSTRUMENTATION_FILES = {
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('metrics.py', 'middleware.py', 'nplusone.py')
+}
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def query_shape(sql):
+    """SQL без различий в длине списков `IN (...)` и пробелах."""
+    return IN_LIST_RE.sub('IN (...)', SPACES_RE.sub(' ', sql.strip()))
+
+
+def _is_project_code(code):
+    return (
+        code.co_filename.startswith(str(settings.BASE_DIR))
+        and code.co_filename not in INSTRUMENTATION_FILES
+    )
+
+
+def query_origin():
+    """Строка шаблона и место в коде проекта, откуда пришёл запрос."""
+    template_line = code_line = None
+    frame = sys._getframe(1)
+    while frame is not None and not (template_line and code_line):
+        code = frame.f_code
+        node = frame.f_locals.get('self')
+        if (template_line is None and code.co_name == 'render_annotated'
+                and isinstance(node, Node) and node.origin is not None):
+            template_line = (
+                f'{node.origin.template_name}:{node.token.lineno} '
+                f'«{node.token.contents}»'
+            )
+        elif code_line is None and _is_project_code(code):
+            code_line = (
+                f'{code.co_filename}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return ', '.join(
+        place for place in (template_line, code_line) if place
+    ) or 'неизвестно'
+
+
+class NPlusOneDetector:
+    """Обёртка выполнения запросов, считающая повторы SELECT.
+
+    Место вызова ищется только для запроса, превысившего порог,
+    поэтому в остальное время цена — подсчёт в словаре.
+    """
+
+    def __init__(self, mode='log', threshold=None):
+        self.mode = mode
+        self.threshold = threshold or getattr(
+            settings, 'NPLUSONE_THRESHOLD', DEFAULT_THRESHOLD)
+        self.counts = Counter()
+        self.findings = []
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip()[:6].upper() == 'SELECT':
+            shape = query_shape(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == self.threshold + 1:
+                self.report(shape)
+        return execute(sql, params, many, context)
+
+    def report(self, shape):
+        origin = query_origin()
+        self.findings.append((shape, origin))
+        message = (
+            f'N+1: запрос выполнен больше {self.threshold} раз '
+            f'({origin}): {shape}'
+        )
+        if self.mode == 'raise':
+            raise NPlusOneError(message)
+        logger.warning(message)
+
+    @contextmanager
+    def watch(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
@@ -0,0 +1,182 @@
+import base64
+import json
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+POSTS_KEYSET_ORDERING = ('-pub_date', '-id')
+COMMENTS_KEYSET_ORDERING = ('created_at', 'id')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction, values):
+    """Упаковывает направление и значения ключа в непрозрачную строку."""
+    payload = json.dumps([direction, [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]])
+    return base64.urlsafe_b64encode(
+        payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(payload)
+    except (ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if direction not in ('next', 'prev') or not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return direction, values
+
+
+def field_name(field):
+    return field.lstrip('-')
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        field_name(field) if field.startswith('-') else f'-{field}'
+        for field in ordering
+    )
+
+
+def seek_filter(ordering, values, backwards=False):
+    """Условие «строго после ключа» для лексикографического порядка."""
+    condition = Q()
+    equal = Q()
+    for field, value in zip(ordering, values):
+        lookup = 'lt' if field.startswith('-') != backwards else 'gt'
+        condition |= equal & Q(**{f'{field_name(field)}__{lookup}': value})
+        equal &= Q(**{field_name(field): value})
+    return condition
+
+
+class KeysetPage(Sequence):
+    is_keyset = True
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        # У пустой страницы нет ключа, от которого идти дальше.
+        return self._has_next and bool(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return encode_cursor(
+            'next', self.paginator.key(self.object_list[-1]))
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous or not self.object_list:
+            return None
+        return encode_cursor(
+            'prev', self.paginator.key(self.object_list[0]))
+
+
+class KeysetPaginator:
+    """Пагинация по ключу без COUNT(*) и OFFSET."""
+
+    def __init__(self, queryset, per_page, ordering=POSTS_KEYSET_ORDERING):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = ordering
+
+    def key(self, obj):
+        return [getattr(obj, field_name(field)) for field in self.ordering]
+
+    def output_field(self, name):
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return self.queryset.query.annotations[name].output_field
+
+    def clean_values(self, cursor, values):
+        """Приводит значения ключа к типам полей: курсор приходит
+        от клиента и может быть подделан.
+        """
+        if len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            try:
+                value = self.output_field(field_name(field)).to_python(value)
+            except (ValidationError, ValueError, TypeError):
+                raise InvalidCursor(cursor)
+            if value is None:
+                raise InvalidCursor(cursor)
+            cleaned.append(value)
+        return cleaned
+
+    def _keys(self, ordering, position):
+        """Ключ объекта на позиции `position` или None."""
+        keys = self.queryset.order_by(*ordering).values_list(
+            *(field_name(field) for field in self.ordering)
+        )[position:position + 1]
+        for key in keys:
+            return list(key)
+        return None
+
+    def last_cursor(self):
+        """Курсор последней страницы; None, если она же первая."""
+        key = self._keys(reverse_ordering(self.ordering), self.per_page)
+        return None if key is None else encode_cursor('next', key)
+
+    def offset_cursor(self, offset):
+        """Курсор страницы, которая начинается с объекта номер `offset`.
+
+        Нужен один раз для перехода со старой ссылки `?page=`; если
+        объектов меньше, это курсор последней страницы.
+        """
+        if offset <= 0:
+            return None
+        key = self._keys(self.ordering, offset - 1)
+        if key is None:
+            return self.last_cursor()
+        return encode_cursor('next', key)
+
+    def page(self, cursor=None):
+        if not cursor:
+            direction, values = 'next', None
+        else:
+            direction, values = decode_cursor(cursor)
+            values = self.clean_values(cursor, values)
+        backwards = direction == 'prev'
+        queryset = self.queryset.order_by(
+            *(reverse_ordering(self.ordering) if backwards
+              else self.ordering)
+        )
+        if values is not None:
+            queryset = queryset.filter(
+                seek_filter(self.ordering, values, backwards))
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+        if backwards:
+            object_list.reverse()
+            return KeysetPage(object_list, self, True, has_more)
+        return KeysetPage(object_list, self, has_more, values is not None)
@@ -1,18 +1,32 @@
-from datetime import datetime
-
 from django.db import models
-from django.db.models import Count
+from django.utils import timezone
+
+# Поля, которые нужны карточке поста в `includes/post_card.html`.
+FEED_FIELDS = (
+    'id', 'title', 'text', 'pub_date', 'is_published',
+    'image', 'image_ready', 'image_renditions',
+    'updated_at', 'comment_count',
+    'author__username',
+    'location__name', 'location__is_published',
+    'category__title', 'category__slug', 'category__is_published',
+)
 
 
 class DatePubQuerySet(models.query.QuerySet):
 
     def date_pub_filter(self):
         return self.filter(
-            pub_date__lte=datetime.now(),
+            pub_date__lte=timezone.now(),
             is_published=True,
             category__is_published=True
         )
 
     def comm_count(self):
-        return self.annotate(
-            comment_count=Count('comments')).order_by('-pub_date')
+        """Число комментариев хранится в `Post.comment_count`."""
+        return self.order_by('-pub_date')
+
+    def feed(self):
+        """Лента постов: связанные объекты одним JOIN-запросом."""
+        return self.select_related(
+            'author', 'location', 'category'
+        ).only(*FEED_FIELDS).comm_count()
@@ -0,0 +1,77 @@
+"""Чтение моделей blog с реплик, запись — в основную базу.
+
+После записи клиент некоторое время читает из основной базы, чтобы
+видеть свои изменения, пока реплика отстаёт: в пределах запроса — по
+состоянию маршрутизации, в следующих запросах — по cookie, которую
+ставит `ReplicaRoutingMiddleware`.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PRIMARY = DEFAULT_DB_ALIAS
+
+
+class RoutingState:
+    """Состояние маршрутизации одного запроса или блока кода."""
+
+    def __init__(self, sticky=False):
+        self.sticky = sticky
+        self.wrote = False
+
+
+routing_state = ContextVar('db_routing_state', default=None)
+
+
+@contextmanager
+def use_primary():
+    """Все чтения внутри блока — из основной базы."""
+    token = routing_state.set(RoutingState(sticky=True))
+    try:
+        yield
+    finally:
+        routing_state.reset(token)
+
+
+def replica_aliases():
+    return getattr(settings, 'DATABASE_REPLICAS', ())
+
+
+class PrimaryReplicaRouter:
+    app_labels = {'blog'}
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if model._meta.app_label not in self.app_labels or not replicas:
+            return None
+        state = routing_state.get()
+        if (
+            state is not None and state.sticky
+            # Внутри транзакции читаем то, что в ней же и записали.
+            or connections[PRIMARY].in_atomic_block
+        ):
+            return PRIMARY
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label not in self.app_labels:
+            return None
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = state.sticky = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема приходит на реплики вместе с данными.
+        if db in replica_aliases():
+            return False
+        return None
@@ -0,0 +1,54 @@
+"""Сброс кэша страниц в момент выхода отложенных публикаций."""
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from blog.cache import invalidate_listings, post_listings
+from blog.models import Post
+
+NEXT_PUBLICATION_KEY = 'scheduler:next_publication'
+_MISSING = object()
+
+
+def next_publication_at(now):
+    return Post.objects.filter(
+        is_published=True, pub_date__gt=now
+    ).aggregate(next=Min('pub_date'))['next']
+
+
+def schedule_publication(pub_date):
+    """Запоминает пост, который выйдет раньше уже известного."""
+    if pub_date <= timezone.now():
+        return
+    due = cache.get(NEXT_PUBLICATION_KEY, _MISSING)
+    if due is not _MISSING and (due is None or pub_date < due):
+        cache.set(NEXT_PUBLICATION_KEY, pub_date, None)
+
+
+def expiry_pending():
+    """Нужно ли `expire_due_publications` обращаться к базе."""
+    due = cache.get(NEXT_PUBLICATION_KEY, _MISSING)
+    return due is _MISSING or (due is not None and due <= timezone.now())
+
+
+def expire_due_publications():
+    """Сбрасывает страницы, на которых только что появились посты.
+
+    В обычном случае это одно чтение из кэша: запрос к базе делается,
+    только когда наступило время ближайшей публикации.
+    """
+    now = timezone.now()
+    due = cache.get(NEXT_PUBLICATION_KEY, _MISSING)
+    if due is _MISSING:
+        cache.set(NEXT_PUBLICATION_KEY, next_publication_at(now), None)
+        return
+    if due is None or due > now:
+        return
+    published = Post.objects.filter(
+        is_published=True, pub_date__gte=due, pub_date__lte=now
+    ).select_related('category', 'author')
+    listings = set()
+    for post in published:
+        listings.update(post_listings(post))
+    invalidate_listings(listings)
+    cache.set(NEXT_PUBLICATION_KEY, next_publication_at(now), None)
@@ -0,0 +1,110 @@
+"""Полнотекстовый поиск по публикациям."""
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from blog.pagination import POSTS_KEYSET_ORDERING
+
+FTS_TABLE = 'blog_post_fts'
+# Совпадение в заголовке весит больше, чем в тексте.
+FTS_WEIGHTS = (10.0, 1.0)
+
+
+def search_terms(query):
+    return query.split()
+
+
+class BaseSearchBackend:
+    """Интерфейс поискового бэкенда.
+
+    `search()` фильтрует и при необходимости аннотирует queryset,
+    `ordering` задаёт порядок выдачи для пагинации по ключу.
+    """
+
+    ordering = POSTS_KEYSET_ORDERING
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, post):
+        pass
+
+    def remove(self, post_id):
+        pass
+
+    def rebuild(self, using=DEFAULT_DB_ALIAS):
+        pass
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Поиск подстрок для баз без полнотекстового индекса."""
+
+    def search(self, queryset, query):
+        condition = Q()
+        for term in search_terms(query):
+            condition &= Q(title__icontains=term) | Q(text__icontains=term)
+        return queryset.filter(condition)
+
+
+class SqliteFTS5Backend(BaseSearchBackend):
+    """Инвертированный индекс SQLite FTS5 с ранжированием bm25."""
+
+    ordering = ('rank', 'id')
+
+    @staticmethod
+    def match_expression(query):
+        # Каждое слово — отдельная фраза: пользовательский ввод
+        # не должен разбираться как синтаксис запросов FTS5.
+        return ' '.join(
+            '"{}"'.format(term.replace('"', '""'))
+            for term in search_terms(query)
+        )
+
+    def search(self, queryset, query):
+        match = self.match_expression(query)
+        return queryset.filter(id__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            (match,),
+        )).annotate(rank=RawSQL(
+            f'SELECT bm25({FTS_TABLE}, %s, %s) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = blog_post.id',
+            (*FTS_WEIGHTS, match),
+            output_field=FloatField(),
+        ))
+
+    def index(self, post):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post.pk,))
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                (post.pk, post.title, post.text),
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', (post_id,))
+
+    def rebuild(self, using=DEFAULT_DB_ALIAS):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, title, text) '
+                'SELECT id, title, text FROM blog_post'
+            )
+
+
+@lru_cache(maxsize=None)
+def get_search_backend():
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    if connection.vendor == 'sqlite':
+        return SqliteFTS5Backend()
+    return SimpleSearchBackend()
@@ -0,0 +1,24 @@
+from django.contrib.sessions.backends import db
+from django.db import router
+
+from blog.write_queue import get_write_coordinator
+
+
+class SessionStore(db.SessionStore):
+    """Сессии в базе, запись — через очередь записи, если она включена."""
+
+    @property
+    def using(self):
+        return router.db_for_write(self.model)
+
+    def save(self, must_create=False):
+        coordinator = get_write_coordinator()
+        if coordinator is None:
+            return super().save(must_create)
+        return coordinator.run(super().save, must_create, using=self.using)
+
+    def delete(self, session_key=None):
+        coordinator = get_write_coordinator()
+        if coordinator is None:
+            return super().delete(session_key)
+        return coordinator.run(super().delete, session_key, using=self.using)
@@ -0,0 +1,178 @@
+import threading
+
+from django.db import connections, transaction
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from blog.cache import (
+    invalidate_all_pages, invalidate_listings, invalidate_post_card,
+    invalidate_post_cards, post_listings
+)
+from blog.images import delete_renditions, make_renditions
+from blog.models import Category, Comment, Location, Post, User
+from blog.scheduler import schedule_publication
+from blog.search import get_search_backend
+
+
+# Посты, которые сейчас удаляются в этом потоке. Django шлёт pre_delete
+# для всех объектов каскада до удаления, а комментарии удаляет раньше
+# поста, так что обработчики комментариев успевают это увидеть.
+_deleting = threading.local()
+
+
+def deleting_posts():
+    if not hasattr(_deleting, 'pks'):
+        _deleting.pks = set()
+    return _deleting.pks
+
+
+@receiver(pre_delete, sender=Post)
+def remember_deleted_post(sender, instance, using, **kwargs):
+    pk = instance.pk
+    deleting_posts().add(pk)
+    # Каскад выполняется в транзакции: если он упадёт и транзакция
+    # откатится, post_delete не придёт, а пост останется в базе.
+    on_end = getattr(connections[using], 'on_transaction_end', None)
+    if on_end is not None:
+        on_end(lambda: deleting_posts().discard(pk))
+
+
+@receiver(post_delete, sender=Post)
+def forget_deleted_post(sender, instance, **kwargs):
+    deleting_posts().discard(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, **kwargs):
+    if created:
+        Post.objects.filter(pk=instance.post_cur_id).update(
+            comment_count=F('comment_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    # Счётчик и кэш удаляемого поста сбросит сам пост.
+    if instance.post_cur_id in deleting_posts():
+        return
+    Post.objects.filter(
+        pk=instance.post_cur_id, comment_count__gt=0
+    ).update(comment_count=F('comment_count') - 1)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_listings(sender, instance, **kwargs):
+    # Пост мог сменить категорию: старую страницу тоже нужно сбросить.
+    old = Post.objects.select_related('category', 'author').filter(
+        pk=instance.pk).first() if instance.pk else None
+    instance._old_listings = post_listings(old) if old else []
+    instance._old_image_name = old.image.name if old else ''
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post(sender, instance, **kwargs):
+    if instance.is_published:
+        schedule_publication(instance.pub_date)
+    invalidate_post_card(instance.pk)
+    invalidate_listings(
+        set(post_listings(instance) + getattr(instance, '_old_listings', []))
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def process_post_image(sender, instance, **kwargs):
+    # Фото, загруженные через формы, обрабатывает очередь `image_jobs`.
+    if (
+        not instance.image_ready
+        or instance.image.name == getattr(instance, '_old_image_name', '')
+    ):
+        return
+    widths = make_renditions(instance.image.name) if instance.image else []
+    Post.objects.filter(pk=instance.pk).update(image_renditions=widths)
+    instance.image_renditions = widths
+
+
+@receiver(post_save, sender=Post)
+def remove_replaced_renditions(sender, instance, **kwargs):
+    old_name = getattr(instance, '_old_image_name', '')
+    if old_name and old_name != instance.image.name:
+        transaction.on_commit(lambda: delete_renditions(old_name))
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_renditions(sender, instance, **kwargs):
+    if instance.image:
+        name = instance.image.name
+        transaction.on_commit(lambda: delete_renditions(name))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_commented_post(sender, instance, **kwargs):
+    if instance.post_cur_id in deleting_posts():
+        return
+    invalidate_post_card(instance.post_cur_id)
+    post = Post.objects.select_related('category', 'author').filter(
+        pk=instance.post_cur_id).first()
+    if post is not None:
+        invalidate_listings(post_listings(post))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_everything(sender, **kwargs):
+    invalidate_post_cards()
+    invalidate_all_pages()
+
+
+# Поля автора, которые выводятся на страницах: имя пользователя — на
+# карточках, полное имя — в шапке профиля.
+AUTHOR_CARD_FIELDS = ('username',)
+AUTHOR_PROFILE_FIELDS = ('first_name', 'last_name')
+AUTHOR_FIELDS = AUTHOR_CARD_FIELDS + AUTHOR_PROFILE_FIELDS
+
+
+@receiver(pre_save, sender=User)
+def remember_author_fields(sender, instance, update_fields=None, **kwargs):
+    # Вход на сайт обновляет только `last_login` — лишний запрос не нужен.
+    if instance.pk is None or (
+        update_fields is not None and not set(update_fields) & set(
+            AUTHOR_FIELDS)
+    ):
+        instance._old_author_fields = None
+        return
+    instance._old_author_fields = User.objects.filter(
+        pk=instance.pk).values(*AUTHOR_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author(sender, instance, created, **kwargs):
+    old = getattr(instance, '_old_author_fields', None)
+    # У нового пользователя ещё нет постов.
+    if created or old is None:
+        return
+    changed = {
+        name for name in AUTHOR_FIELDS
+        if old[name] != getattr(instance, name)
+    }
+    if changed & set(AUTHOR_CARD_FIELDS):
+        invalidate_post_cards()
+        invalidate_all_pages()
+    elif changed:
+        invalidate_listings([f'profile:{instance.username}'])
@@ -0,0 +1,20 @@
+"""Настройки SQLite, которые применяются к каждому новому соединению."""
+import re
+
+PRAGMA_NAME_RE = re.compile(r'^[a-z_]+$')
+
+
+def pragma_statements(pragmas):
+    for name, value in pragmas.items():
+        if not PRAGMA_NAME_RE.match(name):
+            raise ValueError(f'Неверное имя PRAGMA: {name}')
+        if not isinstance(value, int) and not PRAGMA_NAME_RE.match(
+                str(value).lower()):
+            raise ValueError(f'Неверное значение PRAGMA {name}: {value}')
+        yield f'PRAGMA {name} = {value}'
+
+
+def apply_pragmas(raw_connection, pragmas):
+    """Выполняет PRAGMA на соединении sqlite3 в обход обёрток Django."""
+    for statement in pragma_statements(pragmas):
+        raw_connection.execute(statement)
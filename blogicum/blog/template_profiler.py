@@ -0,0 +1,117 @@
+"""Время отрисовки каждого шаблона, `{% include %}` и `{% url %}`.
+
+Профилировщик подменяет `Template._render` и `URLNode.render`.
+Внутри `profile_rendering()` замеры копятся в возвращаемом профиле,
+а при `TEMPLATE_PROFILING = True` каждая отрисовка верхнего уровня
+пишет отчёт в лог `blog.template_profiler` на уровне DEBUG.
+"""
+import logging
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.template.base import Template
+from django.template.defaulttags import URLNode
+
+logger = logging.getLogger(__name__)
+
+_active = ContextVar('template_profile', default=None)
+_originals = {}
+
+
+class RenderProfile:
+    """Число вызовов, полное и собственное время по каждому шаблону."""
+
+    def __init__(self):
+        self.stats = defaultdict(lambda: [0, 0.0, 0.0])
+        self._children = []
+
+    def call(self, name, func, *args):
+        self._children.append(0.0)
+        start = perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            entry = self.stats[name]
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - children
+
+    def rows(self):
+        """(имя, вызовов, полное мс, собственное мс) по убыванию
+        собственного времени.
+        """
+        return sorted(
+            (
+                (name, calls, inclusive * 1000, exclusive * 1000)
+                for name, (calls, inclusive, exclusive) in self.stats.items()
+            ),
+            key=lambda row: row[3], reverse=True,
+        )
+
+    def format(self):
+        lines = [f'{"шаблон / тег":<48}{"вызовов":>9}{"всего мс":>10}'
+                 f'{"своё мс":>10}']
+        for name, calls, inclusive, exclusive in self.rows():
+            lines.append(
+                f'{name:<48}{calls:>9}{inclusive:>10.2f}{exclusive:>10.2f}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile_rendering(profile=None):
+    """Собирает замеры всех отрисовок внутри блока.
+
+    Работает, только если профилировщик установлен (`install()`).
+    """
+    profile = profile or RenderProfile()
+    token = _active.set(profile)
+    try:
+        yield profile
+    finally:
+        _active.reset(token)
+
+
+def _template_render(self, context):
+    profile = _active.get()
+    if profile is not None:
+        return profile.call(
+            self.name or '<string>', _originals['template'], self, context)
+    if not getattr(settings, 'TEMPLATE_PROFILING', False):
+        return _originals['template'](self, context)
+    with profile_rendering() as profile:
+        result = _template_render(self, context)
+    logger.debug('Отрисовка %s:\n%s', self.name, profile.format())
+    return result
+
+
+def _url_render(self, context):
+    profile = _active.get()
+    if profile is None:
+        return _originals['url'](self, context)
+    return profile.call(
+        f'{{% url {self.view_name.token} %}}', _originals['url'],
+        self, context,
+    )
+
+
+def install():
+    if _originals:
+        return
+    _originals['template'] = Template._render
+    _originals['url'] = URLNode.render
+    Template._render = _template_render
+    URLNode.render = _url_render
+
+
+def uninstall():
+    if not _originals:
+        return
+    Template._render = _originals.pop('template')
+    URLNode.render = _originals.pop('url')
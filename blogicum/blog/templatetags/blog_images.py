@@ -0,0 +1,15 @@
+from django import template
+
+from blog.images import rendition_urls
+
+register = template.Library()
+
+
+@register.filter
+def srcset(post):
+    """Значение атрибута `srcset` для фото публикации."""
+    return ', '.join(
+        f'{url} {width}w'
+        for url, width in rendition_urls(
+            post.image.name, post.image_renditions)
+    )
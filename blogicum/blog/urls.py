@@ -8,6 +8,7 @@ posts_pk = [
     path('', views.PostDetailView.as_view(), name='post_detail'),
     path('edit/', views.PostUpdateView.as_view(), name='edit_post'),
     path('delete/', views.PostDeleteView.as_view(), name='delete_post'),
+    path('comments/', views.CommentListView.as_view(), name='comments'),
     path(
         'comment/',
         views.CommentCreateView.as_view(), name='add_comment'
@@ -36,6 +37,12 @@ urlpatterns = [
         ),
         path('create/', views.PostCreateView.as_view(), name='create_post'),
     ])),
+    path('search/', views.SearchView.as_view(), name='search'),
+    path(
+        'export/<str:model_name>/',
+        views.ExportView.as_view(), name='export'
+    ),
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
     path(
         'category/<slug:category_slug>/',
         views.CategoryPostsListView.as_view(), name='category_posts'
@@ -1,37 +1,72 @@
+import hmac
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import (
+    HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+)
 from django.shortcuts import redirect
 from django.views.generic import (
-    DetailView, CreateView, DeleteView, UpdateView
+    DetailView, CreateView, DeleteView, UpdateView, View
 )
 from django.views.generic.detail import SingleObjectMixin
 from django.urls import reverse
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from blog.exports import ExportError, export_rows, gzip_stream, serialize
+from blog.metrics import render_metrics
 from blog.models import User, Post, Category, Comment
+from blog.search import get_search_backend
 from blog.forms import CommentForm, UserUpdateForm
 from blog.cbv_mixins import (
     PostMixin, PostFormMixin, CommentMixin, CommentFormMixin,
-    UserCheck, AuthorCheck, CommentCheck, PaginateByListView
+    UserCheck, AuthorCheck, CommentCheck, PaginateByListView,
+    VisiblePostMixin, CommentsPageMixin, StaffCheck, AsyncReadMixin
 )
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    AsyncReadMixin, VisiblePostMixin, CommentsPageMixin, DetailView
+):
     template_name = 'blog/detail.html'
 
-    def get_queryset(self):
-        base_queryset = Post.objects.all()
-        if self.request.user != self.get_object(
-                queryset=base_queryset).author:
-            return base_queryset.date_pub_filter()
-        return base_queryset
-
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = (
-            self.object.comments.select_related('author')
+        context['comments'] = self.get_comments_page(self.object)
+        return context
+
+
+class CommentListView(VisiblePostMixin, CommentsPageMixin, DetailView):
+    """Следующая порция комментариев: HTML-фрагмент или JSON."""
+
+    template_name = 'includes/comment_list.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['comments'] = self.get_comments_page(
+            self.object, self.request.GET.get('cursor')
         )
         return context
 
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        if self.request.GET.get('format') != 'json':
+            return response
+        comments = context['comments']
+        next_url = None
+        if comments.has_next():
+            next_url = '{}?cursor={}'.format(
+                reverse('blog:comments', kwargs={'pk': self.object.pk}),
+                comments.next_cursor,
+            )
+        return JsonResponse({
+            'html': response.rendered_content,
+            'next_url': next_url,
+        })
+
 
 class PostCreateView(PostMixin, PostFormMixin, CreateView):
 
@@ -65,6 +100,7 @@ class CommentCreateView(
     model = Post
     post_cur = None
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post_cur = self.get_object()
@@ -86,6 +122,10 @@ class CommentUpdateView(CommentFormMixin, AuthorCheck, UpdateView):
 class CommentDeleteView(CommentMixin, AuthorCheck, DeleteView):
     pk_url_kwarg = 'comment_id'
 
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
+
 
 class ProfileUpdateView(LoginRequiredMixin, UserCheck, UpdateView):
     model = User
@@ -98,21 +138,29 @@ class ProfileUpdateView(LoginRequiredMixin, UserCheck, UpdateView):
         )
 
 
-class PostListView(PaginateByListView):
+class PostListView(AsyncReadMixin, PaginateByListView):
     """Возвращает главную страницу."""
 
     template_name = 'blog/index.html'
-    queryset = Post.objects.date_pub_filter(
-    ).select_related('category').comm_count()
+    keyset_pagination = True
+    page_cache_listing = 'index'
+
+    def get_queryset(self):
+        return Post.objects.date_pub_filter().feed()
 
 
-class ProfileListView(SingleObjectMixin, PaginateByListView):
+class ProfileListView(
+    AsyncReadMixin, SingleObjectMixin, PaginateByListView
+):
     """Возвращает профиль автора."""
 
     template_name = 'blog/profile.html'
     slug_url_kwarg = 'username'
     slug_field = 'username'
 
+    def get_page_cache_listing(self):
+        return f'profile:{self.kwargs[self.slug_url_kwarg]}'
+
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(queryset=User.objects.all())
         return super().get(request, *args, **kwargs)
@@ -123,18 +171,23 @@ class ProfileListView(SingleObjectMixin, PaginateByListView):
         return context
 
     def get_queryset(self):
-        base_queryset = self.object.posts.comm_count()
+        base_queryset = self.object.posts.feed()
         if self.request.user != self.object:
             return base_queryset.date_pub_filter()
-        return base_queryset.comm_count().all()
+        return base_queryset
 
 
-class CategoryPostsListView(SingleObjectMixin, PaginateByListView):
+class CategoryPostsListView(
+    AsyncReadMixin, SingleObjectMixin, PaginateByListView
+):
     """Возвращает посты в заданной категории."""
 
     template_name = 'blog/category.html'
     slug_url_kwarg = 'category_slug'
 
+    def get_page_cache_listing(self):
+        return f'category:{self.kwargs[self.slug_url_kwarg]}'
+
     def get(self, request, *args, **kwargs):
         self.object = self.get_object(
             queryset=Category.objects.filter(is_published=True)
@@ -147,4 +200,85 @@ class CategoryPostsListView(SingleObjectMixin, PaginateByListView):
         return context
 
     def get_queryset(self):
-        return self.object.posts.date_pub_filter().comm_count()
+        return self.object.posts.date_pub_filter().feed()
+
+
+class SearchView(PaginateByListView):
+    """Поиск по заголовкам и текстам публикаций."""
+
+    template_name = 'blog/search.html'
+    keyset_pagination = True
+
+    def get(self, request, *args, **kwargs):
+        self.query = request.GET.get('q', '').strip()
+        self.backend = get_search_backend()
+        if self.query:
+            self.keyset_ordering = self.backend.ordering
+        return super().get(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = Post.objects.date_pub_filter().feed()
+        if not self.query:
+            return queryset.none()
+        return self.backend.search(queryset, self.query)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.query
+        context['pagination_params'] = (
+            urlencode({'q': self.query}) + '&' if self.query else ''
+        )
+        return context
+
+
+class ExportView(LoginRequiredMixin, StaffCheck, View):
+    """Потоковая выгрузка публикаций или комментариев для администраторов."""
+
+    content_types = {
+        'jsonl': 'application/x-ndjson',
+        'csv': 'text/csv',
+    }
+
+    def get(self, request, model_name):
+        params = request.GET
+        export_format = params.get('format', 'jsonl')
+        try:
+            fields, rows = export_rows(
+                model_name,
+                category=params.get('category'),
+                author=params.get('author'),
+                since=params.get('since'),
+                until=params.get('until'),
+            )
+            chunks = serialize(export_format, fields, rows)
+        except ExportError as error:
+            return HttpResponseBadRequest(str(error))
+        filename = f'{model_name}s.{export_format}'
+        content_type = self.content_types[export_format]
+        if params.get('gzip'):
+            chunks = gzip_stream(chunks)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(chunks, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{filename}"')
+        return response
+
+
+class MetricsView(View):
+    """Метрики запросов в текстовом формате Prometheus."""
+
+    def has_token(self, request):
+        token = getattr(settings, 'METRICS_TOKEN', None)
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        return bool(token) and hmac.compare_digest(
+            header.encode(), f'Bearer {token}'.encode())
+
+    def get(self, request):
+        allowed = request.META.get('REMOTE_ADDR') in getattr(
+            settings, 'METRICS_ALLOWED_IPS', ())
+        if not (allowed or self.has_token(request)
+                or request.user.is_staff):
+            raise PermissionDenied
+        return HttpResponse(
+            render_metrics(), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,195 @@
+"""Очередь записи в SQLite внутри процесса.
+
+SQLite допускает одного писателя: при нескольких потоках записи
+часть запросов получает «database is locked». Координатор пропускает
+записи по одной и ограничивает очередь. Право записи берётся на уровне
+SQL: на отдельный запрос вне транзакции или от первой записи до конца
+транзакции — ровно на то время, что SQLite держит свою блокировку.
+Код представления (хэширование паролей, загрузка файлов) в очереди
+не ждёт, а повторяется только сам отклонённый запрос.
+Чтение в очередь не попадает.
+"""
+import random
+import threading
+from contextlib import contextmanager
+from itertools import count
+from time import perf_counter, sleep
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+
+DEFAULTS = {
+    'ENABLED': False,
+    'MAX_PENDING': 32,
+    'QUEUE_TIMEOUT': 10,
+    'RETRIES': 5,
+    'BACKOFF': 0.05,
+    'MAX_BACKOFF': 1.0,
+}
+
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+class WriteQueueFull(Exception):
+    pass
+
+
+def is_locked_error(error):
+    return 'locked' in str(error) or 'busy' in str(error)
+
+
+class WriteCoordinator:
+
+    def __init__(self, config):
+        self.config = config
+        options = {**DEFAULTS, **config}
+        self.queue_timeout = options['QUEUE_TIMEOUT']
+        self.retries = options['RETRIES']
+        self.backoff = options['BACKOFF']
+        self.max_backoff = options['MAX_BACKOFF']
+        # Ожидающие и пишущий вместе; сверх этого запрос отклоняется.
+        self._slots = threading.BoundedSemaphore(options['MAX_PENDING'])
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        self.depth = 0
+        self.max_depth = 0
+        self.writes = 0
+        self.wait_seconds = 0.0
+        self.retried = 0
+        self.rejected = 0
+
+    def in_write(self):
+        return getattr(self._local, 'active', False)
+
+    def _reject(self, message):
+        with self._stats_lock:
+            self.rejected += 1
+        raise WriteQueueFull(message)
+
+    def acquire(self):
+        """Место в очереди и затем исключительное право записи.
+
+        Оба ожидания вместе укладываются в `QUEUE_TIMEOUT`.
+        """
+        start = perf_counter()
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            self._reject('Очередь записи переполнена.')
+        enqueued = perf_counter()
+        with self._stats_lock:
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+        if self.queue_timeout is None:
+            remaining = -1
+        else:
+            remaining = max(self.queue_timeout - (enqueued - start), 0)
+        if not self._write_lock.acquire(timeout=remaining):
+            with self._stats_lock:
+                self.depth -= 1
+            self._slots.release()
+            self._reject('Не дождались очереди записи.')
+        with self._stats_lock:
+            self.depth -= 1
+            self.writes += 1
+            self.wait_seconds += perf_counter() - enqueued
+        self._local.active = True
+
+    def release(self):
+        self._local.active = False
+        self._write_lock.release()
+        self._slots.release()
+
+    @contextmanager
+    def slot(self):
+        self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def delay(self, attempt):
+        delay = min(self.backoff * 2 ** attempt, self.max_backoff)
+        return delay * random.uniform(0.5, 1)
+
+    def retry(self, func, *args, **kwargs):
+        for attempt in count():
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as error:
+                if not is_locked_error(error) or attempt >= self.retries:
+                    raise
+            with self._stats_lock:
+                self.retried += 1
+            sleep(self.delay(attempt))
+
+    def __call__(self, execute, sql, params, many, context):
+        """Обёртка выполнения запросов соединения (execute_wrapper)."""
+        if self.in_write():
+            return execute(sql, params, many, context)
+        connection = context['connection']
+        if not connection.in_atomic_block:
+            # Отклонённый запрос вне транзакции ничего не изменил,
+            # его можно повторить.
+            with self.slot():
+                return self.retry(execute, sql, params, many, context)
+        on_end = getattr(connection, 'on_transaction_end', None)
+        if on_end is None:
+            with self.slot():
+                return execute(sql, params, many, context)
+        self.acquire()
+        on_end(self.release)
+        return execute(sql, params, many, context)
+
+    def run(self, func, *args, using=DEFAULT_DB_ALIAS, **kwargs):
+        """Выполняет `func` в транзакции через очередь записи.
+
+        При блокировке базы `func` выполняется заново, поэтому у неё не
+        должно быть побочных эффектов вне базы. Вложенный вызов из той
+        же записи выполняется сразу.
+        """
+        if self.in_write():
+            return func(*args, **kwargs)
+
+        def attempt():
+            with self.slot(), transaction.atomic(using=using):
+                return func(*args, **kwargs)
+
+        return self.retry(attempt)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'depth': self.depth,
+                'max_depth': self.max_depth,
+                'writes': self.writes,
+                'wait_seconds': self.wait_seconds,
+                'retries': self.retried,
+                'rejected': self.rejected,
+            }
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_write_coordinator():
+    """Координатор процесса или None, если он выключен."""
+    global _coordinator
+    config = getattr(settings, 'WRITE_COORDINATOR', {})
+    if not config.get('ENABLED'):
+        return None
+    with _coordinator_lock:
+        if _coordinator is None or _coordinator.config != config:
+            _coordinator = WriteCoordinator(config)
+        return _coordinator
+
+
+def coordinate_writes(execute, sql, params, many, context):
+    """Пропускает запросы записи через координатор, если он включён."""
+    if not sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS):
+        return execute(sql, params, many, context)
+    coordinator = get_write_coordinator()
+    if coordinator is None:
+        return execute(sql, params, many, context)
+    return coordinator(execute, sql, params, many, context)
@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from blogicum.warmup import warm_up_templates
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+os.environ.setdefault('BLOG_ASYNC_VIEWS', '1')
 
 application = get_asgi_application()
+warm_up_templates()
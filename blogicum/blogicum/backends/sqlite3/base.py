@@ -0,0 +1,134 @@
+"""SQLite с проверкой соединений и пулом внутри процесса.
+
+Дополнительные ключи в настройках базы:
+`CONN_HEALTH_CHECKS` — перед первым запросом в цикле запроса проверять,
+что постоянное соединение живо (как в Django 4.1);
+`POOL` — настройки пула (см. pool.DEFAULTS), None отключает пул.
+
+Каждое новое соединение получает PRAGMA из `settings.SQLITE_PRAGMAS`,
+а запросы записи идут через очередь записи (blog.write_queue).
+
+`on_transaction_end()` регистрирует действие на конец транзакции —
+и фиксацию, и откат: в Django 3.2 есть только on_commit.
+"""
+from time import perf_counter
+
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+from blog.sqlite import apply_pragmas
+from blog.write_queue import coordinate_writes
+from blogicum.backends.sqlite3.pool import get_pool, ping, record_connect
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = False
+        self.reused_connection = False
+        self.pool = None
+        self.transaction_end_callbacks = []
+        # Первой в списке, чтобы замеры SQL не включали ожидание очереди.
+        self.execute_wrappers.insert(0, coordinate_writes)
+
+    def on_transaction_end(self, callback):
+        self.transaction_end_callbacks.append(callback)
+
+    def run_transaction_end_callbacks(self):
+        callbacks = self.transaction_end_callbacks
+        self.transaction_end_callbacks = []
+        for callback in callbacks:
+            callback()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self.run_transaction_end_callbacks()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self.run_transaction_end_callbacks()
+
+    @property
+    def health_checks_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def get_pool(self):
+        config = self.settings_dict.get('POOL')
+        # Закрытие базы в памяти уничтожает её, пул там не нужен.
+        if not config or self.is_in_memory_db():
+            return None
+        return get_pool(self.alias, config, self.health_checks_enabled)
+
+    def get_new_connection(self, conn_params):
+        start = perf_counter()
+        self.pool = self.get_pool()
+        connection = None
+        if self.pool is not None:
+            connection = self.pool.acquire(self)
+        self.reused_connection = connection is not None
+        if connection is None:
+            try:
+                connection = super().get_new_connection(conn_params)
+            except Exception:
+                if self.pool is not None:
+                    self.pool.release(self, None)
+                raise
+        record_connect(
+            self.alias, perf_counter() - start, self.reused_connection)
+        self.health_check_done = True
+        return connection
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        pragmas = getattr(settings, 'SQLITE_PRAGMAS', None)
+        # Соединение из пула уже настроено.
+        if pragmas and not self.reused_connection:
+            apply_pragmas(self.connection, pragmas)
+
+    def _close(self):
+        try:
+            return self._close_connection()
+        finally:
+            # Закрытие откатывает незавершённую транзакцию.
+            self.run_transaction_end_callbacks()
+
+    def _close_connection(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        pool, self.pool = self.pool, None
+        # В открытой транзакции Django оставит ссылку на соединение до
+        # отката, поэтому другому потоку его не отдаём, как и сломанное.
+        if self.in_atomic_block or not self.is_usable():
+            with self.wrap_database_errors:
+                self.connection.close()
+            pool.release(self, None)
+        else:
+            pool.release(self, self.connection)
+
+    def is_usable(self):
+        return ping(self.connection)
+
+    def _cursor(self, name=None):
+        # Проверка — перед первым курсором в цикле запроса, как в
+        # Django 4.1: ensure_connection вызывается и из служебных мест.
+        if self.connection is not None and not self.health_check_done:
+            self.health_check_done = True
+            if (
+                self.health_checks_enabled and not self.in_atomic_block
+                and not self.is_usable()
+            ):
+                self.close()
+            else:
+                # Постоянное соединение пережило запрос.
+                record_connect(self.alias, 0.0, reused=True)
+        return super()._cursor(name)
+
+    def close_if_unusable_or_obsolete(self):
+        # Вызывается в начале и в конце каждого запроса.
+        self.health_check_done = False
+        super().close_if_unusable_or_obsolete()
@@ -0,0 +1,183 @@
+"""Пул соединений с SQLite внутри процесса.
+
+Открытие соединения в Django — это не только `sqlite3.connect`, но и
+регистрация десятков SQL-функций и PRAGMA. Пул держит закрытые
+соединения открытыми и отдаёт их следующему запросу: всего не больше
+`MAX_SIZE`, простаивающие дольше `MAX_IDLE` секунд закрываются.
+"""
+import os
+import sqlite3
+import threading
+import weakref
+from collections import defaultdict
+from contextvars import ContextVar
+from time import monotonic
+
+DEFAULTS = {
+    'MAX_SIZE': 8,
+    'MAX_IDLE': 300,
+    'TIMEOUT': 5,
+}
+
+# Замеры текущего запроса: объект с методом record_connect.
+connect_timings = ContextVar('connect_timings', default=None)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    pass
+
+
+def ping(connection):
+    try:
+        connection.execute('SELECT 1').fetchone()
+    except sqlite3.Error:
+        return False
+    return True
+
+
+class ConnectionPool:
+
+    def __init__(self, config, health_checks=False):
+        self.config = config
+        options = {**DEFAULTS, **config}
+        self.max_size = options['MAX_SIZE']
+        self.max_idle = options['MAX_IDLE']
+        self.timeout = options['TIMEOUT']
+        self.health_checks = health_checks
+        self._condition = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        # Соединения родительского процесса после fork не трогаем.
+        self._pid = os.getpid()
+        self._idle = []
+        # Обёртки, которые держат соединение. Обёртка умершего потока
+        # выпадает из набора сама и освобождает место.
+        self._holders = weakref.WeakSet()
+
+    def size(self):
+        return len(self._idle) + len(self._holders)
+
+    def acquire(self, holder):
+        """Возвращает свободное соединение или None, если нужно открыть
+        новое: место под него уже занято за `holder`.
+        """
+        deadline = monotonic() + self.timeout
+        with self._condition:
+            if self._pid != os.getpid():
+                self._reset()
+            self._evict()
+            while not self._idle and self.size() >= self.max_size:
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout('Пул соединений исчерпан.')
+                # Короткое ожидание: место освобождается и без
+                # уведомления, когда собирается обёртка умершего потока.
+                self._condition.wait(min(remaining, 0.05))
+            self._holders.add(holder)
+            while self._idle:
+                connection, _ = self._idle.pop()
+                if not self.health_checks or ping(connection):
+                    return connection
+                connection.close()
+            return None
+
+    def release(self, holder, connection):
+        """Возвращает соединение в пул; None — только освобождает место."""
+        with self._condition:
+            self._holders.discard(holder)
+            if connection is not None and self._pid == os.getpid():
+                try:
+                    if connection.in_transaction:
+                        connection.rollback()
+                    self._idle.append((connection, monotonic()))
+                except sqlite3.Error:
+                    connection.close()
+                self._evict()
+            self._condition.notify()
+
+    def _evict(self):
+        now = monotonic()
+        fresh = []
+        for connection, released_at in self._idle:
+            if now - released_at > self.max_idle:
+                connection.close()
+            else:
+                fresh.append((connection, released_at))
+        self._idle = fresh
+
+    def stats(self):
+        with self._condition:
+            return {'idle': len(self._idle), 'in_use': len(self._holders)}
+
+    def clear(self):
+        """Закрывает свободные соединения, например при остановке."""
+        with self._condition:
+            for connection, _ in self._idle:
+                connection.close()
+            self._idle = []
+
+
+_lock = threading.Lock()
+_pools = {}
+
+
+def get_pool(alias, config, health_checks=False):
+    """Пул для псевдонима базы; пересоздаётся при смене настроек."""
+    with _lock:
+        pool = _pools.get(alias)
+        if pool is None or (pool.config, pool.health_checks) != (
+                config, health_checks):
+            pool = _pools[alias] = ConnectionPool(config, health_checks)
+        return pool
+
+
+class ConnectStats:
+
+    def __init__(self):
+        self.opened = 0
+        self.open_seconds = 0.0
+        self.reused = 0
+        self.saved_seconds = 0.0
+
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(ConnectStats)
+
+
+def record_connect(alias, duration, reused):
+    """Учитывает открытие соединения и оценивает сэкономленное время.
+
+    Экономия при повторном использовании — среднее время открытия
+    нового соединения за вычетом того, что ушло на выдачу из пула.
+    """
+    with _stats_lock:
+        stats = _stats[alias]
+        if reused:
+            mean = stats.open_seconds / stats.opened if stats.opened else 0
+            saved = max(mean - duration, 0.0)
+            stats.reused += 1
+            stats.saved_seconds += saved
+        else:
+            saved = 0.0
+            stats.opened += 1
+            stats.open_seconds += duration
+    timings = connect_timings.get()
+    if timings is not None:
+        timings.record_connect(0.0 if reused else duration, saved)
+
+
+def connection_stats():
+    with _stats_lock:
+        stats = {alias: vars(item).copy() for alias, item in _stats.items()}
+    with _lock:
+        pools = dict(_pools)
+    for alias, pool in pools.items():
+        stats.setdefault(alias, vars(ConnectStats()).copy())
+        stats[alias].update(pool.stats())
+    return stats
+
+
+def reset_connection_stats():
+    with _stats_lock:
+        _stats.clear()
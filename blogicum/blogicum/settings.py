@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,6 +47,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым, чтобы в замер попали все остальные слои.
+    'blog.middleware.RequestMetricsMiddleware',
+    'blog.middleware.NPlusOneMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,8 +58,39 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Ответ 503 при переполненной очереди записи (см. WRITE_COORDINATOR).
+    'blog.middleware.WriteCoordinatorMiddleware',
 ]
 
+# Заголовок Server-Timing с временем SQL, шаблонов и представления.
+SERVER_TIMING = True
+# Адреса, с которых доступен /metrics/ (сотрудникам он доступен всегда).
+# За обратным прокси REMOTE_ADDR у всех запросов — адрес прокси, поэтому
+# по умолчанию список пуст: сборщику метрик выдаётся токен.
+METRICS_ALLOWED_IPS = []
+# Токен для заголовка `Authorization: Bearer <токен>`.
+METRICS_TOKEN = os.environ.get('BLOG_METRICS_TOKEN')
+
+# Поиск N+1: None — выключен, 'log' — предупреждение, 'raise' — ошибка.
+NPLUSONE_DETECTION = 'log' if DEBUG else None
+# Сколько одинаковых SELECT за запрос ещё не считаются N+1.
+NPLUSONE_THRESHOLD = 5
+
+# Очередь записи в SQLite (см. blog.write_queue): запросы INSERT, UPDATE
+# и DELETE выполняются по одному, отклонённый при «database is locked»
+# запрос вне транзакции повторяется.
+WRITE_COORDINATOR = {
+    'ENABLED': False,
+    # Сколько записей может ждать одновременно; сверх этого — ответ 503.
+    'MAX_PENDING': 32,
+    'QUEUE_TIMEOUT': 10,
+    'RETRIES': 5,
+    'BACKOFF': 0.05,
+    'MAX_BACKOFF': 1.0,
+}
+# Сессии в базе, запись через ту же очередь.
+SESSION_ENGINE = 'blog.sessions'
+
 ROOT_URLCONF = 'blogicum.urls'
 
 TEMPLATES_DIR = BASE_DIR / 'templates'
@@ -75,19 +111,87 @@ TEMPLATES = [
     },
 ]
 
+# Время отрисовки шаблонов, включений и {% url %} в лог на уровне DEBUG.
+TEMPLATE_PROFILING = False
+
+# Разбирать все шаблоны при старте воркера; имеет смысл
+# с кэширующим загрузчиком (см. settings_prod.py).
+TEMPLATE_WARM_UP = False
+
+# Асинхронные страницы чтения (см. blog.cbv_mixins.AsyncReadMixin).
+# Имеет смысл только под ASGI: asgi.py включает их через окружение.
+ASYNC_VIEWS = os.environ.get('BLOG_ASYNC_VIEWS') == '1'
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# Соединения (см. blogicum.backends.sqlite3). BLOG_CONN_MAX_AGE — сколько
+# секунд держать соединение между запросами: 0 — закрывать после каждого,
+# none — без ограничения. Закрытое соединение возвращается в пул
+# процесса, если BLOG_DB_POOL_SIZE больше нуля.
+CONN_MAX_AGE = os.environ.get('BLOG_CONN_MAX_AGE', '0')
+CONN_MAX_AGE = None if CONN_MAX_AGE.lower() == 'none' else int(CONN_MAX_AGE)
+DB_POOL_SIZE = int(os.environ.get('BLOG_DB_POOL_SIZE', 8))
+DATABASE_CONNECTION = {
+    'ENGINE': 'blogicum.backends.sqlite3',
+    'CONN_MAX_AGE': CONN_MAX_AGE,
+    'CONN_HEALTH_CHECKS': True,
+    'POOL': {
+        'MAX_SIZE': DB_POOL_SIZE,
+        'MAX_IDLE': 300,
+        'TIMEOUT': 5,
+    } if DB_POOL_SIZE else None,
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        **DATABASE_CONNECTION,
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
 
+# Реплика для чтения моделей blog (см. blog.routers). Локально это
+# копия основной базы в отдельном файле: `manage.py sync_replica`.
+DATABASE_REPLICAS = []
+BLOG_REPLICA_DB = os.environ.get('BLOG_REPLICA_DB')
+if BLOG_REPLICA_DB:
+    DATABASES['replica'] = {
+        **DATABASE_CONNECTION,
+        'NAME': BLOG_REPLICA_DB,
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['blog.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи клиент читает из основной базы.
+REPLICA_STICKY_SECONDS = 10
+
+# PRAGMA для каждого нового соединения с SQLite, их применяет бэкенд
+# blogicum.backends.sqlite3.
+# WAL позволяет читать во время записи; synchronous=NORMAL в режиме WAL
+# не теряет целостность, только последние транзакции при сбое питания.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    'synchronous': 'normal',
+    'busy_timeout': 5000,
+    # Отрицательное значение — размер в КиБ.
+    'cache_size': -20000,
+    'mmap_size': 128 * 1024 * 1024,
+    'temp_store': 'memory',
+}
+
+
+# Кэш страниц и его сброс по сигналам работают в пределах одного процесса,
+# если не указан общий кэш (Memcached, Redis) для всех воркеров.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'blogicum',
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
@@ -0,0 +1,46 @@
+"""Настройки боевого окружения.
+
+Используются так: DJANGO_SETTINGS_MODULE=blogicum.settings_prod.
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import TEMPLATES, WRITE_COORDINATOR
+
+DEBUG = False
+
+# Ключ из репозитория годится только для разработки.
+try:
+    SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+except KeyError:
+    raise ImproperlyConfigured('Задайте переменную DJANGO_SECRET_KEY.')
+
+ALLOWED_HOSTS = os.environ.get(
+    'DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1'
+).split(',')
+
+# Шаблоны читаются с диска и разбираются один раз за жизнь воркера.
+# При указанных явно `loaders` параметр APP_DIRS должен быть выключен.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'debug': False,
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+# Разобрать все шаблоны при старте воркера (см. wsgi.py и asgi.py).
+TEMPLATE_WARM_UP = True
+
+NPLUSONE_DETECTION = None
+TEMPLATE_PROFILING = False
+
+WRITE_COORDINATOR = {**WRITE_COORDINATOR, 'ENABLED': True}
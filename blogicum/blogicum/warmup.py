@@ -0,0 +1,57 @@
+"""Разбор всех шаблонов при старте воркера.
+
+С кэширующим загрузчиком разобранные шаблоны остаются в памяти, и
+первые запросы не читают файлы с диска и не разбирают их заново.
+"""
+import os
+
+from django.conf import settings
+from django.forms.renderers import get_default_renderer
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+
+TEMPLATE_SUFFIXES = ('.html', '.txt')
+
+
+def _template_dirs(engine):
+    dirs = []
+    for loader in engine.template_loaders:
+        for inner in getattr(loader, 'loaders', [loader]):
+            dirs.extend(inner.get_dirs())
+    return dirs
+
+
+def _template_names(directory):
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if filename.endswith(TEMPLATE_SUFFIXES):
+                yield os.path.relpath(
+                    os.path.join(root, filename), directory
+                ).replace(os.sep, '/')
+
+
+def warm_up_templates(force=False):
+    """Разбирает шаблоны всех движков и рендерера форм.
+
+    Без `TEMPLATE_WARM_UP = True` (и без `force`) ничего не делает.
+    Возвращает число разобранных шаблонов.
+    """
+    if not (force or getattr(settings, 'TEMPLATE_WARM_UP', False)):
+        return 0
+    backends = [
+        backend for backend in engines.all()
+        if isinstance(backend, DjangoTemplates)
+    ]
+    renderer_backend = getattr(get_default_renderer(), 'engine', None)
+    if isinstance(renderer_backend, DjangoTemplates):
+        backends.append(renderer_backend)
+    parsed = 0
+    for backend in backends:
+        seen = set()
+        for directory in _template_dirs(backend.engine):
+            for name in _template_names(directory):
+                if name not in seen:
+                    seen.add(name)
+                    backend.engine.get_template(name)
+                    parsed += 1
+    return parsed
@@ -0,0 +1,25 @@
+import pytest
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--nplusone",
+        action="store_true",
+        help="Падать на N+1 в любом запросе к представлениям.",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "nplusone: падать на N+1 в запросах этого теста"
+    )
+
+
+@pytest.fixture(autouse=True)
+def nplusone_detection(request, settings):
+    if (request.config.getoption("--nplusone")
+            or request.node.get_closest_marker("nplusone")):
+        settings.NPLUSONE_DETECTION = "raise"
+    else:
+        settings.NPLUSONE_DETECTION = None
+    yield
@@ -0,0 +1,78 @@
+import asyncio
+import importlib
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django.urls import clear_url_caches
+
+import blog.urls
+import blogicum.urls
+
+pytestmark = [pytest.mark.django_db]
+
+
+def reload_urls():
+    importlib.reload(blog.urls)
+    importlib.reload(blogicum.urls)
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    reload_urls()
+
+
+@pytest.fixture
+def async_client():
+    client = AsyncClient()
+
+    async def get(*args, **kwargs):
+        return await client.get(*args, **kwargs)
+
+    return async_to_sync(get)
+
+
+def test_views_are_async(async_views):
+    from blog import views
+    for view in (
+        views.PostListView, views.ProfileListView,
+        views.CategoryPostsListView, views.PostDetailView,
+    ):
+        assert asyncio.iscoroutinefunction(view.as_view()), (
+            f'Убедитесь, что {view.__name__} асинхронно под ASGI.'
+        )
+
+
+def test_sync_views_by_default():
+    from blog.views import PostListView
+    assert not asyncio.iscoroutinefunction(PostListView.as_view())
+
+
+def test_async_pages_render(
+        async_views, async_client, post_with_published_location, comment):
+    post = post_with_published_location
+    for url in (
+        '/', f'/posts/{post.id}/', f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ):
+        response = async_client(url)
+        assert response.status_code == 200, url
+        assert post.title.encode() in response.content, url
+    assert async_client('/posts/100500/').status_code == 404
+
+
+def test_async_cache_hit_skips_database(
+        async_views, async_client, post_with_published_location,
+        django_assert_num_queries):
+    first = async_client('/')
+    assert first['X-Page-Cache'] == 'MISS'
+    with django_assert_num_queries(0):
+        second = async_client('/')
+    assert second['X-Page-Cache'] == 'HIT'
+    assert second.content == first.content
+    assert 'sql;dur=' in second['Server-Timing']
@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+import pytest
+
+from benchmarks.harness import Benchmark, compare, percentile
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile([7], 90) == 7
+
+
+@pytest.mark.django_db
+def test_benchmark_measure_skips_warmup():
+    calls = []
+
+    def request():
+        calls.append(1)
+        return SimpleNamespace(
+            status_code=200, streaming=False, content=b'x' * len(calls))
+
+    benchmark = Benchmark(rounds=4, warmup=2)
+    result = benchmark.measure('page', request)
+    assert len(calls) == 6
+    assert result['rounds'] == 4
+    assert result['queries'] == 0
+    assert result['bytes'] == 6
+    assert benchmark.report()['results'] == {'page': result}
+
+
+def test_compare_flags_regressions():
+    base = {'p50_ms': 10, 'p90_ms': 20, 'bytes': 1000, 'queries': 3}
+    baseline = {'results': {'index': base, 'removed': base}}
+    assert compare({'index': dict(base, p50_ms=12)}, baseline, 0.25) == []
+    regressions = compare(
+        {'index': dict(base, p50_ms=13, queries=4)}, baseline, 0.25)
+    assert regressions == [
+        'index: p50_ms 13 > 10', 'index: queries 4 > 3']
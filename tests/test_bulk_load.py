@@ -0,0 +1,124 @@
+import gzip
+import io
+import json
+import sqlite3
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, connections
+
+from blog.bulk_load import iter_json_array
+from blog.models import Comment, Post
+from blog.search import SqliteFTS5Backend
+
+pytestmark = [pytest.mark.django_db]
+
+RECORDS = [
+    {
+        "model": "blog.post", "pk": 10,
+        "fields": {
+            "created_at": "2022-12-18T23:06:18.993Z", "is_published": True,
+            "title": "Маяк [в тумане], \"старый\"", "text": "Текст, ]",
+            "pub_date": "2022-12-18T23:06:00Z", "author": 7,
+            "location": None, "category": 3, "image": "",
+        },
+    },
+    {
+        "model": "blog.comment", "pk": 20,
+        "fields": {
+            "created_at": "2022-12-19T10:00:00Z", "text": "Хорошо",
+            "post_cur": 10, "author": 7,
+        },
+    },
+    {
+        "model": "blog.category", "pk": 3,
+        "fields": {
+            "created_at": "2022-12-18T23:04:48.750Z", "is_published": True,
+            "title": "Наблюдения", "slug": "details", "description": "-",
+        },
+    },
+    {
+        "model": "auth.user", "pk": 7,
+        "fields": {
+            "password": "!", "username": "keeper", "email": "",
+            "date_joined": "2022-12-18T23:00:00Z",
+            "groups": [], "user_permissions": [],
+        },
+    },
+]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 7, 4096))
+def test_iter_json_array_streams_records(chunk_size):
+    stream = io.StringIO(json.dumps(RECORDS, ensure_ascii=False, indent=2))
+    assert list(iter_json_array(stream, chunk_size)) == RECORDS
+
+
+def test_iter_json_array_rejects_truncated_file():
+    stream = io.StringIO(json.dumps(RECORDS)[:-20])
+    with pytest.raises(ValueError):
+        list(iter_json_array(stream, 16))
+
+
+def test_bulk_loaddata_command(tmp_path, client):
+    fixture = tmp_path / "dump.json.gz"
+    with gzip.open(fixture, "wt", encoding="utf-8") as dump:
+        json.dump(RECORDS, dump)
+
+    out = io.StringIO()
+    call_command(
+        "bulk_loaddata", str(fixture), batch_size=1, commit_every=2,
+        stdout=out,
+    )
+
+    post = Post.objects.get(pk=10)
+    assert post.author.username == "keeper"
+    assert post.created_at.year == 2022
+    assert post.comment_count == 1
+    assert Comment.objects.get(pk=20).post_cur == post
+    assert "объектов/с" in out.getvalue()
+    response = client.get("/search/", {"q": "маяк"})
+    assert [p.id for p in response.context["page_obj"]] == [10]
+
+
+@pytest.fixture
+def second_db(tmp_path):
+    """Отдельная база с той же схемой, что и default."""
+    connection.ensure_connection()
+    target = sqlite3.connect(tmp_path / "second.sqlite3")
+    connection.connection.backup(target)
+    target.close()
+    connections.databases["second"] = {
+        **connections.databases["default"],
+        "NAME": str(tmp_path / "second.sqlite3"),
+        "CONN_MAX_AGE": 0,
+        "POOL": None,
+        "TEST": {},
+    }
+    yield "second"
+    connections["second"].close()
+    del connections["second"]
+    del connections.databases["second"]
+
+
+def test_bulk_loaddata_into_other_database(tmp_path, second_db):
+    fixture = tmp_path / "dump.json"
+    fixture.write_text(json.dumps(RECORDS), encoding="utf-8")
+
+    call_command(
+        "bulk_loaddata", str(fixture), database=second_db,
+        stdout=io.StringIO(),
+    )
+
+    assert not Post.objects.filter(pk=10).exists(), (
+        "Убедитесь, что записи не попадают в базу default."
+    )
+    post = Post.objects.using(second_db).get(pk=10)
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчики пересчитываются в целевой базе."
+    )
+    found = SqliteFTS5Backend().search(
+        Post.objects.using(second_db), "маяк")
+    assert [p.id for p in found] == [10], (
+        "Убедитесь, что поисковый индекс перестраивается в целевой базе."
+    )
@@ -0,0 +1,160 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.models import Location
+from blog.scheduler import NEXT_PUBLICATION_KEY
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_unchanged_card_is_served_from_cache(
+        client, post_with_published_location
+):
+    location = post_with_published_location.location
+    assert location.name in client.get("/").content.decode("utf-8")
+
+    # Обновление в обход сигналов не сбрасывает кэш карточки.
+    Location.objects.filter(pk=location.pk).update(name="Новое место")
+    assert location.name in client.get("/").content.decode("utf-8")
+
+
+def test_location_change_invalidates_card(
+        client, post_with_published_location
+):
+    client.get("/")
+    location = post_with_published_location.location
+    location.name = "Новое место"
+    location.save()
+    assert "Новое место" in client.get("/").content.decode("utf-8")
+
+
+def test_new_comment_invalidates_card(
+        mixer: Mixer, client, user, post_with_published_location
+):
+    assert "Комментарии (0)" in client.get("/").content.decode("utf-8")
+    mixer.blend(
+        "blog.Comment", post_cur=post_with_published_location, author=user
+    )
+    assert "Комментарии (1)" in client.get("/").content.decode("utf-8")
+
+
+def test_anonymous_page_cache_is_invalidated_by_post_edit(
+        client, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/profile/{post.author.username}/"
+    client.get(url)
+    assert client.get(url)["X-Page-Cache"] == "HIT"
+
+    post.title = "Новый заголовок"
+    post.save()
+    response = client.get(url)
+    assert response["X-Page-Cache"] == "MISS"
+    assert "Новый заголовок" in response.content.decode("utf-8")
+
+
+def test_page_cache_key_uses_only_valid_page_params(
+        client, post_with_published_location
+):
+    url = f"/profile/{post_with_published_location.author.username}/"
+    for params in ({"cursor": "junk-1"}, {"cursor": "junk-2"},
+                   {"page": "x"}):
+        response = client.get(url, params)
+        assert "X-Page-Cache" not in response, (
+            "Убедитесь, что страницы с произвольными параметрами "
+            "не попадают в кэш."
+        )
+    client.get(url, {"page": "01"})
+    assert client.get(url, {"page": "1"})["X-Page-Cache"] == "HIT"
+
+
+def test_page_cache_is_not_used_for_logged_in_users(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    assert "X-Page-Cache" not in user_client.get("/")
+
+
+def test_scheduled_post_appears_on_cached_page(
+        mixer: Mixer, client, user, published_category
+):
+    now = timezone.now()
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(hours=1),
+    )
+    assert post.title not in client.get("/").content.decode("utf-8")
+    assert client.get("/")["X-Page-Cache"] == "HIT"
+
+    with mock.patch(
+            "django.utils.timezone.now",
+            return_value=now + timedelta(hours=2)
+    ):
+        response = client.get("/")
+    assert response["X-Page-Cache"] == "MISS"
+    assert post.title in response.content.decode("utf-8")
+
+
+def test_earlier_scheduled_post_moves_expiry(
+        mixer: Mixer, client, user, published_category
+):
+    now = timezone.now()
+    client.get("/")
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(minutes=5),
+    )
+    assert cache.get(NEXT_PUBLICATION_KEY) == post.pub_date
+
+
+def _cached_profile(client, post):
+    url = f"/profile/{post.author.username}/"
+    client.get(url)
+    assert client.get(url)["X-Page-Cache"] == "HIT"
+    return url
+
+
+def test_signup_and_password_change_keep_page_cache(
+        mixer: Mixer, client, post_with_published_location
+):
+    url = _cached_profile(client, post_with_published_location)
+    mixer.blend("auth.User")
+    author = post_with_published_location.author
+    author.set_password("новый-пароль")
+    author.email = "author@example.com"
+    author.save()
+    assert client.get(url)["X-Page-Cache"] == "HIT", (
+        "Убедитесь, что регистрация и изменения, не видные на страницах, "
+        "не сбрасывают кэш."
+    )
+
+
+def test_author_name_change_invalidates_profile(
+        client, post_with_published_location
+):
+    url = _cached_profile(client, post_with_published_location)
+    client.get("/")
+    author = post_with_published_location.author
+    author.first_name = "Смотритель"
+    author.save()
+    response = client.get(url)
+    assert response["X-Page-Cache"] == "MISS"
+    assert "Смотритель" in response.content.decode("utf-8")
+    assert client.get("/")["X-Page-Cache"] == "HIT"
+
+
+def test_username_change_invalidates_cards(
+        client, post_with_published_location
+):
+    client.get("/")
+    author = post_with_published_location.author
+    author.username = "keeper"
+    author.save()
+    response = client.get("/")
+    assert response["X-Page-Cache"] == "MISS"
+    assert "@keeper" in response.content.decode("utf-8")
@@ -0,0 +1,115 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+from blog.models import Comment, Post
+from blog.signals import deleting_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _comment_count(post):
+    return Post.objects.values_list(
+        "comment_count", flat=True).get(pk=post.pk)
+
+
+def test_views_maintain_comment_count(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Первый"})
+    user_client.post(f"/posts/{post.id}/comment/", {"text": "Второй"})
+    assert _comment_count(post) == 2
+
+    comment = Comment.objects.filter(post_cur=post).first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}")
+    assert _comment_count(post) == 1
+
+
+def test_cascade_delete_updates_comment_count(
+        mixer: Mixer, post_with_published_location, another_user
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post_cur=post, author=another_user)
+    assert _comment_count(post) == 3
+    another_user.delete()
+    assert _comment_count(post) == 0
+
+
+def _delete_queries(mixer, user, category, comments):
+    post = mixer.blend("blog.Post", author=user, category=category)
+    mixer.cycle(comments).blend("blog.Comment", post_cur=post, author=user)
+    with CaptureQueriesContext(connection) as queries:
+        post.delete()
+    return len(queries)
+
+
+def test_post_cascade_skips_per_comment_work(
+        mixer: Mixer, user, published_category
+):
+    few = _delete_queries(mixer, user, published_category, 2)
+    many = _delete_queries(mixer, user, published_category, 30)
+    assert many == few, (
+        "Убедитесь, что удаление поста не выполняет запросов "
+        "для каждого комментария."
+    )
+
+
+def test_author_cascade_keeps_other_posts_counts(
+        mixer: Mixer, post_with_published_location, another_user,
+        published_category
+):
+    post = post_with_published_location
+    own_post = mixer.blend(
+        "blog.Post", author=another_user, category=published_category)
+    mixer.cycle(3).blend(
+        "blog.Comment", post_cur=own_post, author=another_user)
+    mixer.cycle(2).blend("blog.Comment", post_cur=post, author=another_user)
+    another_user.delete()
+    assert _comment_count(post) == 0
+    assert not Post.objects.filter(pk=own_post.pk).exists()
+    assert not deleting_posts()
+
+
+class CascadeFailed(Exception):
+    pass
+
+
+# Транзакция должна по-настоящему откатиться, а не остаться внутри
+# транзакции теста.
+@pytest.mark.django_db(transaction=True)
+def test_failed_post_delete_is_forgotten(
+        mixer: Mixer, post_with_published_location, user
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post_cur=post, author=user)
+
+    def fail(sender, **kwargs):
+        raise CascadeFailed
+
+    post_delete.connect(fail, sender=Comment)
+    try:
+        with pytest.raises(CascadeFailed):
+            post.delete()
+    finally:
+        post_delete.disconnect(fail, sender=Comment)
+
+    assert post.pk not in deleting_posts(), (
+        "Убедитесь, что пост, удаление которого откатилось, "
+        "не считается удаляемым."
+    )
+    Comment.objects.filter(post_cur=post).first().delete()
+    assert _comment_count(post) == 1
+
+
+def test_recount_comments_command(
+        mixer: Mixer, post_with_published_location, user
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend("blog.Comment", post_cur=post, author=user)
+    Post.objects.update(comment_count=100)
+    call_command("recount_comments", batch_size=1)
+    assert _comment_count(post) == 2
@@ -0,0 +1,63 @@
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_generate_dataset_command():
+    call_command(
+        'generate_dataset', users=20, categories=4, locations=5, posts=300,
+        comments=2000, batch_size=64, seed=1,
+    )
+    assert User.objects.count() == 20
+    assert Category.objects.count() == 4
+    assert Location.objects.count() == 5
+    assert Post.objects.count() == 300
+    assert Comment.objects.count() == 2000
+
+    now = timezone.now()
+    assert Post.objects.filter(pub_date__gt=now).exists(), (
+        'Убедитесь, что среди публикаций есть отложенные.'
+    )
+    assert Post.objects.filter(is_published=False).exists(), (
+        'Убедитесь, что среди публикаций есть снятые с публикации.'
+    )
+    assert not Post.objects.filter(updated_at__isnull=True).exists()
+
+    counts = sorted(
+        Post.objects.values_list('comment_count', flat=True), reverse=True)
+    assert sum(counts) == 2000
+    top_share = sum(counts[:len(counts) // 5]) / sum(counts)
+    assert top_share > 0.5, (
+        'Убедитесь, что комментарии распределены с тяжёлым хвостом.'
+    )
+    per_post = Counter(
+        Comment.objects.values_list('post_cur_id', flat=True))
+    assert all(
+        post.comment_count == per_post[post.id]
+        for post in Post.objects.all()
+    )
+
+
+def test_generate_dataset_appends_to_existing_data():
+    call_command(
+        'generate_dataset', users=3, categories=2, locations=0, posts=10,
+        comments=0, seed=1,
+    )
+    call_command(
+        'generate_dataset', users=3, categories=2, locations=0, posts=10,
+        comments=0, seed=1,
+    )
+    assert User.objects.count() == 6
+    assert Post.objects.count() == 20
+
+
+def test_generate_dataset_requires_authors():
+    with pytest.raises(CommandError):
+        call_command('generate_dataset', users=0, posts=10, comments=0)
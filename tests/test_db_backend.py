@@ -0,0 +1,185 @@
+import gc
+import re
+import sqlite3
+
+import pytest
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.test import RequestFactory
+
+from blog.metrics import render_metrics
+from blogicum.backends.sqlite3.base import DatabaseWrapper
+from blogicum.backends.sqlite3.pool import (
+    ConnectionPool, PoolTimeout, connection_stats, reset_connection_stats
+)
+
+
+class Holder:
+    pass
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    return str(tmp_path / 'pool.sqlite3')
+
+
+@pytest.fixture
+def make_wrapper(db_file):
+    wrappers = []
+
+    def make(**options):
+        settings_dict = {
+            **connections.databases['default'],
+            'NAME': db_file,
+            'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': True,
+            'POOL': {'MAX_SIZE': 2, 'TIMEOUT': 0.01},
+            **options,
+        }
+        wrapper = DatabaseWrapper(settings_dict, alias='pool_test')
+        wrappers.append(wrapper)
+        return wrapper
+
+    yield make
+    for wrapper in wrappers:
+        if wrapper.pool is not None:
+            wrapper.pool.release(wrapper, None)
+        wrapper.pool = None
+        wrapper.close()
+    reset_connection_stats()
+
+
+def test_pool_reuses_and_limits_connections(db_file):
+    pool = ConnectionPool({'MAX_SIZE': 1, 'TIMEOUT': 0.01})
+    first = Holder()
+    assert pool.acquire(first) is None, 'Пустой пул не выдаёт соединений.'
+    connection = sqlite3.connect(db_file, check_same_thread=False)
+    with pytest.raises(PoolTimeout):
+        pool.acquire(Holder())
+    pool.release(first, connection)
+    assert pool.acquire(Holder()) is connection, (
+        'Убедитесь, что возвращённое соединение выдаётся повторно.'
+    )
+
+
+def test_pool_frees_slot_of_lost_holder(db_file):
+    pool = ConnectionPool({'MAX_SIZE': 1, 'TIMEOUT': 0.5})
+    pool.acquire(Holder())
+    gc.collect()
+    holder = Holder()
+    assert pool.acquire(holder) is None
+    assert pool.stats() == {'idle': 0, 'in_use': 1}
+
+
+def test_pool_evicts_idle_connections(db_file):
+    pool = ConnectionPool({'MAX_SIZE': 2, 'MAX_IDLE': 0})
+    holder = Holder()
+    pool.acquire(holder)
+    connection = sqlite3.connect(db_file)
+    pool.release(holder, connection)
+    assert pool.stats()['idle'] == 0
+    with pytest.raises(sqlite3.ProgrammingError):
+        connection.execute('SELECT 1')
+
+
+@pytest.mark.django_db
+def test_closed_connection_goes_back_to_pool(make_wrapper):
+    first = make_wrapper()
+    first.ensure_connection()
+    raw = first.connection
+    first.close()
+    assert first.connection is None
+    second = make_wrapper()
+    with second.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    assert second.connection is raw and second.reused_connection
+    stats = connection_stats()['pool_test']
+    assert (stats['opened'], stats['reused']) == (1, 1)
+    assert stats['saved_seconds'] > 0, (
+        'Убедитесь, что учитывается сэкономленное время открытия.'
+    )
+
+
+@pytest.mark.django_db
+def test_health_check_replaces_broken_connection(make_wrapper):
+    wrapper = make_wrapper(CONN_MAX_AGE=None, POOL=None)
+    wrapper.ensure_connection()
+    wrapper.connection.close()
+    wrapper.close_if_unusable_or_obsolete()
+    with wrapper.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        assert cursor.fetchone() == (1,), (
+            'Убедитесь, что сломанное постоянное соединение заменяется '
+            'перед запросом.'
+        )
+
+
+@pytest.fixture
+def file_replica(settings, db_file):
+    """Чтение моделей blog — из файла SQLite с пулом, как в проде."""
+    connection.ensure_connection()
+    target = sqlite3.connect(db_file)
+    connection.connection.backup(target)
+    target.close()
+    connections.databases['file_replica'] = {
+        **connections.databases['default'],
+        'NAME': db_file,
+        'CONN_MAX_AGE': 0,
+        'CONN_HEALTH_CHECKS': True,
+        'POOL': {'MAX_SIZE': 2},
+        'TEST': {},
+    }
+    settings.DATABASE_REPLICAS = ['file_replica']
+    reset_connection_stats()
+    yield 'file_replica'
+    connections['file_replica'].close()
+    pool = connections['file_replica'].get_pool()
+    if pool is not None:
+        pool.clear()
+    del connections['file_replica']
+    del connections.databases['file_replica']
+    reset_connection_stats()
+
+
+def _wsgi_get(handler, path):
+    """Полный цикл запроса: в отличие от тестового клиента, с закрытием
+    соединений по request_started и request_finished.
+    """
+    environ = RequestFactory().get(path).environ
+    response = handler(environ, lambda status, headers: None)
+    b''.join(response)
+    response.close()
+    return response
+
+
+# Внутри транзакции основной базы маршрутизатор не читает с реплики.
+@pytest.mark.django_db(transaction=True)
+def test_requests_reuse_pooled_connections(file_replica):
+    handler = WSGIHandler()
+    history = []
+    for _ in range(3):
+        # Страница из кэша обошлась бы без базы.
+        cache.clear()
+        response = _wsgi_get(handler, '/')
+        assert response.status_code == 200
+        assert 'db-connect;dur=' in response['Server-Timing']
+        stats = connection_stats()[file_replica]
+        history.append((stats['reused'], stats['saved_seconds']))
+        assert stats['in_use'] == 0, (
+            'Убедитесь, что соединение возвращается в пул после запроса.'
+        )
+    assert connection_stats()[file_replica]['opened'] == 1
+    assert [reused for reused, _ in history] == [0, 1, 2]
+    assert history[0][1] < history[1][1] < history[2][1], (
+        'Убедитесь, что сэкономленное время растёт с каждым запросом.'
+    )
+    metrics = render_metrics()
+    saved = re.search(
+        r'blog_db_connect_saved_seconds_total\{view="blog:index"\} (\S+)',
+        metrics)
+    assert float(saved.group(1)) > 0
+    assert (
+        f'blog_db_connections_reused_total{{database="{file_replica}"}} 2'
+        in metrics
+    )
@@ -0,0 +1,112 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.exports import export_rows
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def staff_client(client, user):
+    user.is_staff = True
+    user.save()
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def export_posts(mixer, user, another_user):
+    first, second = mixer.cycle(2).blend(
+        'blog.Category', slug=(slug for slug in ('first', 'second')))
+    posts = mixer.cycle(3).blend('blog.Post', author=user, category=first)
+    mixer.blend('blog.Post', author=another_user, category=second)
+    mixer.cycle(2).blend('blog.Comment', post_cur=posts[0], author=user)
+    return posts
+
+
+def read_jsonl(content):
+    return [json.loads(line) for line in content.decode().splitlines()]
+
+
+def test_export_command_jsonl_filters(export_posts, user, tmp_path):
+    output = tmp_path / 'posts.jsonl'
+    call_command(
+        'export_blog', 'post', author=user.username, output=str(output))
+    records = read_jsonl(output.read_bytes())
+    assert [record['id'] for record in records] == [
+        post.id for post in export_posts]
+    assert records[0]['title'] == export_posts[0].title
+
+    call_command(
+        'export_blog', 'comment', category='second', output=str(output))
+    assert output.read_bytes() == b''
+
+
+def test_export_command_gzip_csv(export_posts, tmp_path):
+    output = tmp_path / 'comments.csv.gz'
+    call_command(
+        'export_blog', 'comment', format='csv', gzip=True,
+        output=str(output))
+    rows = list(csv.reader(io.StringIO(
+        gzip.decompress(output.read_bytes()).decode())))
+    assert rows[0] == [
+        'id', 'post_cur_id', 'author_id', 'text', 'created_at']
+    assert len(rows) == Comment.objects.count() + 1
+
+
+@pytest.mark.parametrize('client_name', ('user_client', 'unlogged_client'))
+def test_export_view_requires_staff(export_posts, request, client_name):
+    client = request.getfixturevalue(client_name)
+    response = client.get('/export/post/')
+    assert response.status_code in (302, 403), (
+        'Убедитесь, что выгрузка доступна только администраторам.'
+    )
+
+
+def test_export_view_streams(export_posts, staff_client):
+    response = staff_client.get('/export/post/', {'gzip': 1})
+    assert response.status_code == 200
+    assert response.streaming
+    assert response['Content-Type'] == 'application/gzip'
+    content = gzip.decompress(b''.join(response.streaming_content))
+    assert len(read_jsonl(content)) == Post.objects.count()
+
+    for since in ('вчера', '2020-13-45', '2020-01-01T25:00'):
+        response = staff_client.get('/export/post/', {'since': since})
+        assert response.status_code == 400
+    response = staff_client.get('/export/user/')
+    assert response.status_code == 400
+
+
+def test_export_bounds_use_site_timezone(
+        mixer, user, settings, recwarn
+):
+    settings.TIME_ZONE = 'Europe/Moscow'
+    # 2020-01-02 01:30 по Москве, но ещё 2020-01-01 в UTC.
+    post = mixer.blend(
+        'blog.Post', author=user,
+        pub_date=datetime(2020, 1, 1, 22, 30, tzinfo=timezone.utc))
+
+    for since, until in (
+        ('2020-01-02', '2020-01-03'),
+        ('2020-01-02T01:00', '2020-01-02T02:00'),
+    ):
+        _, rows = export_rows('post', since=since, until=until)
+        assert [row[0] for row in rows] == [post.id], (
+            'Убедитесь, что границы выгрузки задаются в часовом поясе '
+            'сайта.'
+        )
+    _, rows = export_rows('post', until='2020-01-02')
+    assert list(rows) == []
+    assert not [
+        warning for warning in recwarn
+        if issubclass(warning.category, RuntimeWarning)
+    ], 'Убедитесь, что в фильтры передаются даты с часовым поясом.'
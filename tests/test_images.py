@@ -0,0 +1,236 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+from django.core.files.images import ImageFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.image_jobs import MAX_ATTEMPTS, STALE_AFTER, run_pending_jobs
+from blog.images import make_renditions, rendition_name
+from blog.models import ImageJob, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _image_file(width, height):
+    img_io = BytesIO()
+    Image.new("RGB", (width, height), color=(73, 109, 137)).save(
+        img_io, format="JPEG")
+    return ImageFile(img_io, name="temp_image.jpg")
+
+
+@pytest.fixture
+def post_with_large_image(
+        mixer: Mixer, user, published_location, published_category):
+    return mixer.blend(
+        "blog.Post",
+        location=published_location,
+        category=published_category,
+        author=user,
+        image=_image_file(1000, 500),
+    )
+
+
+def test_renditions_are_made_on_upload(post_with_large_image):
+    post = Post.objects.get(pk=post_with_large_image.pk)
+    assert post.image_renditions == [320, 640]
+    for width in post.image_renditions:
+        with default_storage.open(
+                rendition_name(post.image.name, width)) as rendition:
+            assert Image.open(rendition).width == width
+
+
+@pytest.mark.parametrize("mode", ("RGBA", "P"))
+def test_transparent_image_is_flattened_on_white(mode):
+    image = Image.new("RGBA", (1000, 500), (0, 0, 0, 0))
+    image.paste((200, 0, 0, 255), (400, 200, 600, 300))
+    if mode == "P":
+        image = image.convert("P")
+        image.info["transparency"] = image.getpixel((0, 0))
+    img_io = BytesIO()
+    image.save(img_io, format="PNG")
+    name = default_storage.save("transparent.png", img_io)
+    try:
+        assert make_renditions(name) == [320, 640]
+        with default_storage.open(rendition_name(name, 320)) as rendition:
+            corner = Image.open(rendition).getpixel((0, 0))
+        assert min(corner) > 240, (
+            "Убедитесь, что прозрачный фон не становится чёрным."
+        )
+    finally:
+        default_storage.delete(name)
+        for width in (320, 640):
+            default_storage.delete(rendition_name(name, width))
+
+
+def _renditions_exist(image_name):
+    return [
+        default_storage.exists(rendition_name(image_name, width))
+        for width in (320, 640)
+    ]
+
+
+def test_stale_renditions_are_removed(
+        post_with_large_image, django_capture_on_commit_callbacks):
+    post = post_with_large_image
+    old_name = post.image.name
+    assert _renditions_exist(old_name) == [True, True]
+    with django_capture_on_commit_callbacks(execute=True):
+        post.image = _image_file(800, 400)
+        post.save()
+    assert _renditions_exist(old_name) == [False, False], (
+        "Убедитесь, что копии старого фото удаляются при замене."
+    )
+    new_name = post.image.name
+    assert _renditions_exist(new_name) == [True, True]
+    with django_capture_on_commit_callbacks(execute=True):
+        post.delete()
+    assert _renditions_exist(new_name) == [False, False], (
+        "Убедитесь, что копии фото удаляются вместе с постом."
+    )
+
+
+def test_srcset_in_post_card(client, post_with_large_image):
+    content = client.get("/").content.decode("utf-8")
+    assert "srcset=" in content
+    assert "_640.jpg 640w" in content
+
+
+def test_backfill_command(post_with_large_image):
+    Post.objects.update(image_renditions=[])
+    call_command("make_renditions", workers=1)
+    post = Post.objects.get(pk=post_with_large_image.pk)
+    assert post.image_renditions == [320, 640]
+
+
+def _upload(name="upload.jpg", width=1000, height=500, exif=None):
+    img_io = BytesIO()
+    image = Image.new("RGB", (width, height), color=(73, 109, 137))
+    image.save(img_io, format="JPEG", exif=exif or b"")
+    return SimpleUploadedFile(name, img_io.getvalue(), "image/jpeg")
+
+
+def _create_post(user_client, category, image):
+    user_client.post("/posts/create/", {
+        "title": "С фото",
+        "text": "Текст",
+        "pub_date": "2020-01-01T10:00",
+        "category": category.id,
+        "is_published": True,
+        "image": image,
+    })
+    return Post.objects.get(title="С фото")
+
+
+def test_uploaded_image_is_processed_by_worker(
+        user_client, published_category
+):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90°.
+    post = _create_post(
+        user_client, published_category, _upload(exif=exif.tobytes()))
+    original = post.image.name
+    assert not post.image_ready
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.PENDING
+    content = user_client.get(f"/posts/{post.id}/").content.decode("utf-8")
+    assert "image_processing.svg" in content
+
+    call_command("process_image_jobs", once=True)
+
+    post.refresh_from_db()
+    job.refresh_from_db()
+    assert job.status == ImageJob.DONE
+    assert post.image_ready
+    assert post.image_renditions == [320]
+    with default_storage.open(post.image.name) as image_file:
+        image = Image.open(image_file)
+        assert image.size == (500, 1000)
+        assert not image.getexif()
+        # Таблица квантования качества 75 начинается с 8, 95 — с 2.
+        assert image.quantization[0][0] <= 3, (
+            "Убедитесь, что JPEG пересохраняется с высоким качеством."
+        )
+    assert post.image.name != original
+    assert not default_storage.exists(original), (
+        "Убедитесь, что исходный файл удаляется после переключения поста."
+    )
+
+
+def test_failed_processing_keeps_original(
+        monkeypatch, user_client, published_category
+):
+    post = _create_post(user_client, published_category, _upload())
+    original = post.image.name
+
+    def broken(image_name):
+        raise OSError("диск заполнен")
+
+    monkeypatch.setattr("blog.image_jobs.make_renditions", broken)
+    call_command("process_image_jobs", once=True)
+    post.refresh_from_db()
+    assert post.image.name == original
+    assert default_storage.exists(original)
+    assert ImageJob.objects.get(post=post).status == ImageJob.FAILED
+
+
+def test_broken_upload_is_dropped_by_worker(
+        user_client, published_category
+):
+    broken = SimpleUploadedFile("broken.jpg", b"not an image", "image/jpeg")
+    post = _create_post(user_client, published_category, broken)
+    call_command("process_image_jobs", once=True)
+    post.refresh_from_db()
+    assert ImageJob.objects.get(post=post).status == ImageJob.FAILED
+    assert not post.image
+    assert post.image_ready
+
+
+def _abandon(job, attempts, leftover):
+    """Задача, чей воркер упал, оставив недописанный файл."""
+    ImageJob.objects.filter(pk=job.pk).update(
+        status=ImageJob.PROCESSING,
+        attempts=attempts,
+        normalized_name=leftover,
+        updated_at=timezone.now() - STALE_AFTER * 2,
+    )
+
+
+def test_stale_job_with_exhausted_attempts_fails(
+        user_client, published_category
+):
+    post = _create_post(user_client, published_category, _upload())
+    job = ImageJob.objects.get(post=post)
+    leftover = default_storage.save(post.image.name, _upload())
+    _abandon(job, MAX_ATTEMPTS, leftover)
+
+    assert run_pending_jobs() == 0, (
+        "Убедитесь, что брошенная задача без попыток не берётся снова."
+    )
+    job.refresh_from_db()
+    assert job.status == ImageJob.FAILED
+    assert not default_storage.exists(leftover), (
+        "Убедитесь, что файл упавшей попытки удаляется."
+    )
+    post.refresh_from_db()
+    assert default_storage.exists(post.image.name)
+
+
+def test_stale_job_is_retried_without_leftover(
+        user_client, published_category
+):
+    post = _create_post(user_client, published_category, _upload())
+    job = ImageJob.objects.get(post=post)
+    leftover = default_storage.save(post.image.name, _upload())
+    _abandon(job, MAX_ATTEMPTS - 1, leftover)
+
+    assert run_pending_jobs() == 1
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == (ImageJob.DONE, MAX_ATTEMPTS)
+    assert not default_storage.exists(leftover), (
+        "Убедитесь, что файл упавшей попытки удаляется."
+    )
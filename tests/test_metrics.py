@@ -0,0 +1,63 @@
+import re
+
+import pytest
+
+from blog.metrics import reset_metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+def test_server_timing_header(client, mixer):
+    mixer.cycle(2).blend('blog.Post', category__is_published=True)
+    response = client.get('/')
+    timing = response['Server-Timing']
+    for metric in ('sql', 'view', 'tpl', 'total'):
+        assert re.search(rf'\b{metric};dur=\d+\.\d', timing), (
+            f'Убедитесь, что заголовок Server-Timing содержит `{metric}`.'
+        )
+    assert 'desc="2 queries"' in timing
+
+
+def test_metrics_endpoint(client, metrics_auth):
+    client.get('/')
+    client.get('/')
+    client.get('/posts/100500/')
+    response = client.get('/metrics/', **metrics_auth)
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain')
+    body = response.content.decode()
+    assert 'blog_requests_total{view="blog:index"} 2' in body
+    assert 'blog_requests_total{view="blog:post_detail"} 1' in body
+    assert 'blog_request_duration_seconds_count{view="blog:index"} 2' in body
+    assert 'blog_page_cache_hits_total 1' in body
+    assert 'blog_page_cache_misses_total 1' in body
+
+
+def test_metrics_endpoint_access(
+        settings, client, user_client, user, metrics_auth):
+    response = client.get('/metrics/')
+    assert response.status_code == 403, (
+        'Убедитесь, что /metrics/ не открыт для локальных адресов '
+        'по умолчанию: за прокси они есть у всех запросов.'
+    )
+    response = client.get(
+        '/metrics/', HTTP_AUTHORIZATION='Bearer wrong-token')
+    assert response.status_code == 403
+    assert client.get('/metrics/', **metrics_auth).status_code == 200
+    settings.METRICS_ALLOWED_IPS = ['10.0.0.2']
+    assert client.get('/metrics/', REMOTE_ADDR='10.0.0.2').status_code == 200
+    response = client.get('/metrics/', REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == 403
+    response = user_client.get('/metrics/', REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == 403
+    user.is_staff = True
+    user.save()
+    response = user_client.get('/metrics/', REMOTE_ADDR='10.0.0.1')
+    assert response.status_code == 200
@@ -0,0 +1,56 @@
+import pytest
+from django.template.loader import render_to_string
+
+from blog.models import Comment
+from blog.nplusone import NPlusOneDetector, NPlusOneError, query_shape
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_query_shape_ignores_in_list_length():
+    assert query_shape(
+        'SELECT * FROM t WHERE id IN (%s, %s)'
+    ) == query_shape('SELECT *\n FROM t WHERE id IN (%s)')
+
+
+@pytest.fixture
+def comments(mixer, post_with_published_location):
+    return mixer.cycle(4).blend(
+        'blog.Comment', post_cur=post_with_published_location)
+
+
+def test_detector_names_template_line(
+        comments, post_with_published_location):
+    with pytest.raises(NPlusOneError) as error:
+        with NPlusOneDetector('raise', threshold=2).watch():
+            render_to_string('includes/comment_list.html', {
+                'comments': Comment.objects.all(),
+                'post': post_with_published_location,
+            })
+    message = str(error.value)
+    assert 'includes/comment_list.html:5' in message, (
+        'Убедитесь, что в сообщении о N+1 указана строка шаблона.'
+    )
+    assert 'comment.author.username' in message
+
+
+def test_detector_logs_by_default(comments, caplog):
+    with NPlusOneDetector(threshold=2).watch() as detector:
+        for comment in Comment.objects.all():
+            comment.author.username
+    assert len(detector.findings) == 1
+    assert 'N+1' in caplog.text
+
+
+@pytest.mark.nplusone
+@pytest.mark.parametrize('url', ('/', '/posts/{post_id}/'))
+def test_views_have_no_nplusone(
+        comments, post_with_published_location, mixer, user, client, url):
+    mixer.cycle(12).blend(
+        'blog.Post', author=user,
+        category=post_with_published_location.category,
+        location=post_with_published_location.location,
+    )
+    response = client.get(
+        url.format(post_id=post_with_published_location.id))
+    assert response.status_code == 200
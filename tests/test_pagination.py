@@ -0,0 +1,188 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from blog.pagination import encode_cursor
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = timezone.now()
+    # Две пары постов с одинаковой датой: ключ должен различать их по id.
+    pub_dates = [
+        now - timedelta(hours=1 + i // 2) for i in range(N_PER_PAGE * 2 + 5)
+    ]
+    return mixer.cycle(len(pub_dates)).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(date for date in pub_dates),
+    )
+
+
+def _page_ids(response):
+    return [post.id for post in response.context["page_obj"]]
+
+
+def _feed_order(posts):
+    return [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True)
+    ]
+
+
+def test_keyset_walks_whole_feed(client, feed_posts):
+    expected = _feed_order(feed_posts)
+    pages = []
+    response = client.get("/")
+    while True:
+        pages.append(_page_ids(response))
+        cursor = response.context["page_obj"].next_cursor
+        if cursor is None:
+            break
+        response = client.get("/", {"cursor": cursor})
+    assert [post_id for page in pages for post_id in page] == expected
+    assert [len(page) for page in pages] == [N_PER_PAGE, N_PER_PAGE, 5]
+
+    previous = response.context["page_obj"].previous_cursor
+    response = client.get("/", {"cursor": previous})
+    assert _page_ids(response) == pages[1]
+
+
+def test_keyset_page_skips_count(client, feed_posts):
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/")
+    assert not any("COUNT(*)" in query["sql"] for query in queries)
+
+
+def test_offset_links_still_work(client, feed_posts):
+    response = client.get("/", {"page": 2})
+    assert response.status_code == 200
+    assert len(response.context["page_obj"]) == N_PER_PAGE
+
+
+@pytest.mark.parametrize(
+    "params", ({"cursor": "garbage"}, {"page": "x"}, {"page": 0}))
+def test_bad_page_requests_return_404(client, feed_posts, params):
+    assert client.get("/", params).status_code == 404
+
+
+def _follow_redirect(client, params):
+    response = client.get("/", params)
+    assert response.status_code == 302, (
+        "Убедитесь, что старые ссылки на страницы перенаправляются "
+        "на курсор."
+    )
+    return client.get(response.url)
+
+
+def test_last_page_link_redirects_to_cursor(client, feed_posts):
+    response = _follow_redirect(client, {"page": "last"})
+    page = response.context["page_obj"]
+    assert _page_ids(response) == _feed_order(feed_posts)[-N_PER_PAGE:]
+    assert not page.has_next() and page.has_previous()
+
+
+def test_deep_page_link_redirects_to_cursor(
+        client, feed_posts, monkeypatch
+):
+    monkeypatch.setattr("blog.cbv_mixins.OFFSET_PAGES_LIMIT", 1)
+    expected = _feed_order(feed_posts)
+    response = _follow_redirect(client, {"page": 2})
+    assert _page_ids(response) == expected[N_PER_PAGE:N_PER_PAGE * 2]
+    response = _follow_redirect(client, {"page": 1000})
+    assert _page_ids(response) == expected[-N_PER_PAGE:]
+
+
+def test_stale_cursor_renders_empty_page(client, feed_posts):
+    # Курсор после последнего поста: следующие посты удалены.
+    cursor = encode_cursor(
+        "next", [timezone.now() - timedelta(days=365), 1])
+    response = client.get("/", {"cursor": cursor})
+    assert response.status_code == 200
+    page = response.context["page_obj"]
+    assert len(page) == 0
+    assert page.next_cursor is None and page.previous_cursor is None
+    assert "cursor=None" not in response.content.decode()
+
+
+@pytest.mark.parametrize("values", (
+    ["abc", 1], [{"a": 1}, 1], [None, 1], ["2020-01-01T00:00:00", "x"],
+    [[], 1],
+))
+@pytest.mark.parametrize("url", ("/", "/search/?q=test"))
+def test_tampered_cursor_returns_404(client, feed_posts, url, values):
+    response = client.get(url, {"cursor": encode_cursor("next", values)})
+    assert response.status_code == 404, (
+        "Убедитесь, что подделанный курсор не приводит к ошибке сервера."
+    )
+
+
+@pytest.fixture
+def many_comments(mixer: Mixer, user, post_with_published_location):
+    return mixer.cycle(45).blend(
+        "blog.Comment", post_cur=post_with_published_location, author=user
+    )
+
+
+def test_post_detail_shows_first_comments_page(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.id}/")
+    comments = response.context["comments"]
+    assert [c.id for c in comments] == [c.id for c in many_comments[:20]]
+    assert comments.has_next()
+
+
+def test_comments_endpoint_loads_next_batches(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/comments/"
+    loaded = []
+    params = {"format": "json"}
+    while True:
+        response = client.get(url, params)
+        assert response.status_code == 200
+        loaded.extend(
+            c.id for c in response.context["comments"])
+        data = response.json()
+        assert "comment_" in data["html"]
+        if data["next_url"] is None:
+            break
+        url, cursor = data["next_url"].split("?cursor=")
+        params = {"format": "json", "cursor": cursor}
+    assert loaded == [c.id for c in many_comments]
+
+
+def test_comments_endpoint_hides_unpublished_posts(
+        client, post_with_published_location, many_comments
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
+
+
+def test_comments_after_last_and_tampered_cursor(
+        client, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/comments/"
+    last = many_comments[-1]
+    cursor = encode_cursor("next", [last.created_at, last.id])
+    response = client.get(url, {"format": "json", "cursor": cursor})
+    assert response.status_code == 200
+    assert response.json()["next_url"] is None
+    cursor = encode_cursor("prev", [last.created_at, last.id + 1000])
+    assert client.get(url, {"cursor": cursor}).status_code == 200
+    cursor = encode_cursor("next", ["abc", "x"])
+    assert client.get(url, {"cursor": cursor}).status_code == 404
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+# COUNT для пагинатора + выборка страницы, плюс запрос объекта страницы
+# (пользователь или категория) там, где он нужен. Главная страница
+# пагинируется по ключу и обходится без COUNT. Ещё один запрос на пустом
+# кэше узнаёт время ближайшей отложенной публикации.
+FEED_PAGES_QUERIES = (
+    ("/", 2),
+    ("/profile/{username}/", 4),
+    ("/category/{slug}/", 4),
+)
+
+
+@pytest.fixture
+def make_posts(mixer: Mixer, user, published_category, published_location):
+    def _make_posts(n):
+        return mixer.cycle(n).blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            location=published_location,
+            is_published=True,
+            pub_date=timezone.now() - timedelta(days=1),
+        )
+    return _make_posts
+
+
+@pytest.mark.parametrize("n_posts", (1, N_PER_PAGE))
+@pytest.mark.parametrize("url, n_queries", FEED_PAGES_QUERIES)
+def test_feed_queries_do_not_depend_on_page_size(
+        client, user, published_category, make_posts,
+        django_assert_num_queries, n_posts, url, n_queries
+):
+    make_posts(n_posts)
+    url = url.format(username=user.username, slug=published_category.slug)
+    with django_assert_num_queries(n_queries):
+        response = client.get(url)
+        response.content.decode("utf-8")
+    assert len(response.context["page_obj"]) == n_posts
+
+
+@pytest.mark.parametrize("url, n_queries", FEED_PAGES_QUERIES)
+def test_cached_feed_pages_skip_database(
+        client, user, published_category, make_posts,
+        django_assert_num_queries, url, n_queries
+):
+    make_posts(N_PER_PAGE)
+    url = url.format(username=user.username, slug=published_category.slug)
+    assert client.get(url)["X-Page-Cache"] == "MISS"
+    with django_assert_num_queries(0):
+        response = client.get(url)
+    assert response["X-Page-Cache"] == "HIT"
+
+
+@pytest.mark.parametrize(
+    "client_fixture, n_queries",
+    (
+        # Сессия и пользователь, пост со связями, комментарии.
+        ("user_client", 4),
+        ("another_user_client", 4),
+        ("unlogged_client", 2),
+    ),
+)
+def test_post_detail_queries(
+        request, mixer: Mixer, user, post_with_published_location,
+        django_assert_num_queries, client_fixture, n_queries
+):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post_cur=post, author=user)
+    client = request.getfixturevalue(client_fixture)
+    with django_assert_num_queries(n_queries):
+        response = client.get(f"/posts/{post.id}/")
+        response.content.decode("utf-8")
+    assert response.status_code == 200
+
+
+def test_hidden_post_detail_is_404_for_others(
+        user_client, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    assert user_client.get(f"/posts/{post.id}/").status_code == 200
+    assert another_user_client.get(f"/posts/{post.id}/").status_code == 404
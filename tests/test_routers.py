@@ -0,0 +1,67 @@
+from time import time
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from blog.middleware import ReplicaRoutingMiddleware
+from blog.models import Post
+from blog.routers import (
+    PrimaryReplicaRouter, RoutingState, routing_state, use_primary
+)
+
+COOKIE = ReplicaRoutingMiddleware.cookie_name
+
+
+@pytest.fixture
+def router(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    return PrimaryReplicaRouter()
+
+
+def test_no_replicas_keeps_default_routing():
+    assert PrimaryReplicaRouter().db_for_read(Post) is None
+
+
+def test_reads_go_to_replica_and_writes_to_primary(router):
+    assert router.db_for_read(Post) == 'replica'
+    assert router.db_for_write(Post) == 'default'
+    assert router.db_for_read(get_user_model()) is None, (
+        'Убедитесь, что маршрутизируются только модели blog.'
+    )
+    assert router.allow_migrate('replica', 'blog') is False
+
+
+def test_reads_stick_to_primary_after_write(router):
+    token = routing_state.set(RoutingState())
+    try:
+        assert router.db_for_read(Post) == 'replica'
+        router.db_for_write(Post)
+        assert router.db_for_read(Post) == 'default', (
+            'Убедитесь, что после записи чтение идёт из основной базы.'
+        )
+    finally:
+        routing_state.reset(token)
+    with use_primary():
+        assert router.db_for_read(Post) == 'default'
+
+
+@pytest.mark.django_db
+def test_write_sets_sticky_cookie(
+        settings, user_client, post_with_published_location):
+    # В тестах реплика — зеркало основной базы.
+    settings.DATABASE_REPLICAS = ['default']
+    post = post_with_published_location
+    response = user_client.get(f'/posts/{post.id}/')
+    assert COOKIE not in response.cookies, (
+        'Убедитесь, что чтение не привязывает клиента к основной базе.'
+    )
+    assert not response.wsgi_request.db_routing.sticky
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Свой комментарий'})
+    cookie = response.cookies[COOKIE]
+    assert float(cookie.value) > time()
+    assert cookie['max-age'] == settings.REPLICA_STICKY_SECONDS
+    response = user_client.get(f'/posts/{post.id}/')
+    assert response.wsgi_request.db_routing.sticky, (
+        'Убедитесь, что после записи клиент читает из основной базы.'
+    )
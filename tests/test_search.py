@@ -0,0 +1,85 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer: Mixer, user, published_category):
+    def _make_post(title, text, **kwargs):
+        kwargs.setdefault("is_published", True)
+        kwargs.setdefault("pub_date", timezone.now() - timedelta(days=1))
+        return mixer.blend(
+            "blog.Post", author=user, category=published_category,
+            title=title, text=text, **kwargs
+        )
+    return _make_post
+
+
+def _found_ids(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_search_ranks_title_matches_first(client, make_post):
+    in_text = make_post("Про погоду", "Над городом пролетел дракон")
+    in_title = make_post("Дракон", "Большой и зелёный")
+    make_post("Про котов", "Ничего общего")
+    assert _found_ids(client, "ДРАКОН") == [in_title.id, in_text.id]
+    assert _found_ids(client, "дракон зелёный") == [in_title.id]
+
+
+def test_search_respects_visibility(client, make_post):
+    make_post("Черновик единорога", "текст", is_published=False)
+    make_post(
+        "Будущий единорог", "текст",
+        pub_date=timezone.now() + timedelta(days=1))
+    visible = make_post("Единорог", "текст")
+    assert _found_ids(client, "единорог") == [visible.id]
+
+
+def test_search_index_follows_edits_and_deletes(client, make_post):
+    post = make_post("Старое название", "текст")
+    post.title = "Новое название"
+    post.save()
+    assert _found_ids(client, "старое") == []
+    assert _found_ids(client, "новое") == [post.id]
+    post.delete()
+    assert _found_ids(client, "новое") == []
+
+
+def test_search_is_paginated_by_cursor(client, make_post):
+    posts = [make_post(f"Заметка {i}", "маяк") for i in range(N_PER_PAGE + 3)]
+    response = client.get("/search/", {"q": "маяк"})
+    first = [post.id for post in response.context["page_obj"]]
+    cursor = response.context["page_obj"].next_cursor
+    assert "q=%D0%BC%D0%B0%D1%8F%D0%BA&amp;cursor=" in (
+        response.content.decode("utf-8"))
+    second = _found_ids(client, "маяк", cursor=cursor)
+    assert len(first) == N_PER_PAGE
+    assert sorted(first + second) == sorted(post.id for post in posts)
+
+
+def test_search_ignores_fts_syntax(client, make_post):
+    make_post("Звёзды", "текст")
+    assert _found_ids(client, 'звёзды" OR NEAR(') == []
+    assert _found_ids(client, "") == []
+
+
+def test_search_offset_pages_keep_rank_order(client, make_post):
+    make_post("Про погоду", "Над городом пролетел дракон")
+    make_post("Дракон", "Большой и зелёный")
+    make_post("Дракон и дракон", "дракон")
+    by_cursor = _found_ids(client, "дракон")
+    assert _found_ids(client, "дракон", page=1) == by_cursor, (
+        "Убедитесь, что старые ссылки `?page=` сортируют по релевантности."
+    )
+    response = client.get("/search/", {"q": "дракон", "page": "last"})
+    assert response.status_code == 302
+    assert "q=" in response.url
@@ -0,0 +1,60 @@
+import sqlite3
+
+import pytest
+from django.conf import settings
+from django.db import connection
+
+from blog.sqlite import apply_pragmas
+from blogicum.backends.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+
+def pragma(name):
+    with connection.cursor() as cursor:
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+
+def test_new_connections_get_pragmas():
+    connection.close()
+    connection.ensure_connection()
+    assert pragma('synchronous') == 1, (
+        'Убедитесь, что для SQLite включён synchronous=NORMAL.'
+    )
+    assert pragma('busy_timeout') == settings.SQLITE_PRAGMAS['busy_timeout']
+    assert pragma('cache_size') == settings.SQLITE_PRAGMAS['cache_size']
+    assert pragma('temp_store') == 2
+
+
+def test_wal_on_file_database(tmp_path):
+    raw = sqlite3.connect(tmp_path / 'db.sqlite3')
+    apply_pragmas(raw, settings.SQLITE_PRAGMAS)
+    assert raw.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    raw.close()
+
+
+@pytest.mark.parametrize('pragmas', (
+    {'journal_mode; DROP TABLE x': 'wal'},
+    {'journal_mode': 'wal; DROP TABLE x'},
+))
+def test_pragmas_are_validated(pragmas):
+    with pytest.raises(ValueError):
+        apply_pragmas(sqlite3.connect(':memory:'), pragmas)
+
+
+def test_backend_configures_connections_without_signals(tmp_path):
+    # Соединение, открытое в обход обработчиков приложения.
+    wrapper = DatabaseWrapper({
+        **connection.settings_dict,
+        'NAME': str(tmp_path / 'db.sqlite3'),
+        'POOL': None,
+    }, alias='no_signals')
+    try:
+        wrapper.connect()
+        raw = wrapper.connection
+        assert raw.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert raw.execute('PRAGMA busy_timeout').fetchone()[0] == (
+            settings.SQLITE_PRAGMAS['busy_timeout'])
+    finally:
+        wrapper.close()
@@ -0,0 +1,49 @@
+import logging
+
+import pytest
+from django.template.loader import render_to_string
+
+from blog.template_profiler import install, profile_rendering, uninstall
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profiler():
+    install()
+    yield
+    uninstall()
+
+
+def test_profile_rendering_collects_includes_and_urls(
+        profiler, client, mixer, user, published_category):
+    mixer.cycle(3).blend(
+        'blog.Post', author=user, category=published_category,
+        location=None,
+    )
+    with profile_rendering() as profile:
+        client.get('/')
+    stats = profile.stats
+    assert stats['blog/index.html'][0] == 1
+    assert stats['includes/post_card.html'][0] == 3, (
+        'Убедитесь, что профиль учитывает каждое включение шаблона.'
+    )
+    assert stats["{% url 'blog:profile' %}"][0] == 3
+    for calls, inclusive, exclusive in stats.values():
+        assert 0 <= exclusive <= inclusive
+    index = stats['blog/index.html']
+    assert index[1] >= stats['includes/post_card.html'][1]
+
+
+def test_top_level_render_is_logged(profiler, settings, caplog):
+    settings.TEMPLATE_PROFILING = True
+    with caplog.at_level(logging.DEBUG, logger='blog.template_profiler'):
+        render_to_string('includes/footer.html')
+    assert 'includes/footer.html' in caplog.text
+
+
+def test_profiler_is_inactive_without_profile(profiler, settings, caplog):
+    settings.TEMPLATE_PROFILING = False
+    with caplog.at_level(logging.DEBUG, logger='blog.template_profiler'):
+        render_to_string('includes/footer.html')
+    assert caplog.text == ''
@@ -0,0 +1,73 @@
+import importlib
+import sys
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.template.loaders.filesystem import Loader
+
+from blogicum.warmup import warm_up_templates
+
+pytestmark = [pytest.mark.django_db]
+
+
+def import_settings_prod():
+    sys.modules.pop('blogicum.settings_prod', None)
+    return importlib.import_module('blogicum.settings_prod')
+
+
+def test_settings_prod_requires_secret_key(monkeypatch):
+    monkeypatch.delenv('DJANGO_SECRET_KEY', raising=False)
+    with pytest.raises(ImproperlyConfigured):
+        import_settings_prod()
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'prod-key')
+    assert import_settings_prod().SECRET_KEY == 'prod-key'
+
+
+@pytest.fixture
+def disk_reads(settings, monkeypatch):
+    monkeypatch.setenv('DJANGO_SECRET_KEY', 'prod-key')
+    settings.TEMPLATES = import_settings_prod().TEMPLATES
+    reads = []
+    get_contents = Loader.get_contents
+
+    def counting_get_contents(self, origin):
+        # Отсутствующие файлы (поиск 403.html и т. п.) не считаются:
+        # кэширующий загрузчик запоминает и промахи.
+        contents = get_contents(self, origin)
+        reads.append(origin.name)
+        return contents
+
+    monkeypatch.setattr(Loader, 'get_contents', counting_get_contents)
+    return reads
+
+
+def test_no_template_reads_after_warm_up(
+        disk_reads, client, user_client, post_with_published_location,
+        comment):
+    post = post_with_published_location
+    assert warm_up_templates(force=True) >= 32
+    disk_reads.clear()
+    urls = (
+        (client, '/'),
+        (client, f'/posts/{post.id}/'),
+        (client, f'/category/{post.category.slug}/'),
+        (client, f'/profile/{post.author.username}/'),
+        (client, '/search/?q=test'),
+        (client, '/pages/about/'),
+        (client, '/auth/login/'),
+        (client, '/auth/registration/'),
+        (client, '/posts/100500/'),
+        (user_client, '/posts/create/'),
+        (user_client, f'/posts/{post.id}/edit/'),
+        (user_client, f'/posts/{post.id}/edit_comment/{comment.id}'),
+    )
+    for client_, url in urls:
+        client_.get(url)
+    assert disk_reads == [], (
+        'Убедитесь, что после прогрева шаблоны не читаются с диска.'
+    )
+
+
+def test_warm_up_is_disabled_by_default(disk_reads):
+    assert warm_up_templates() == 0
+    assert disk_reads == []
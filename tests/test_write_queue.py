@@ -0,0 +1,299 @@
+import threading
+from time import perf_counter, sleep
+
+import pytest
+from django.db import OperationalError, connection, transaction
+
+from blog.forms import CommentForm
+from blog.models import Comment
+from blog.write_queue import (
+    WriteCoordinator, WriteQueueFull, coordinate_writes,
+    get_write_coordinator
+)
+from blogicum.backends.sqlite3.base import DatabaseWrapper
+
+pytestmark = [pytest.mark.django_db]
+
+CONFIG = {'ENABLED': True, 'BACKOFF': 0.001, 'MAX_BACKOFF': 0.002}
+
+
+def test_run_retries_locked_database():
+    coordinator = WriteCoordinator(CONFIG)
+    attempts = []
+
+    def write():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise OperationalError('database is locked')
+        return 'ok'
+
+    assert coordinator.run(write) == 'ok'
+    assert coordinator.stats()['retries'] == 2
+    assert coordinator.stats()['writes'] == 3
+
+
+def test_run_gives_up_and_skips_other_errors():
+    coordinator = WriteCoordinator({**CONFIG, 'RETRIES': 1})
+
+    def locked():
+        raise OperationalError('database is locked')
+
+    def broken():
+        raise OperationalError('no such table: x')
+
+    with pytest.raises(OperationalError):
+        coordinator.run(locked)
+    assert coordinator.stats()['retries'] == 1
+    with pytest.raises(OperationalError):
+        coordinator.run(broken)
+    assert coordinator.stats()['retries'] == 1
+
+
+def test_writes_are_serialized_and_nested_runs_pass_through():
+    coordinator = WriteCoordinator(CONFIG)
+    active = []
+    overlaps = []
+
+    def write():
+        active.append(1)
+        overlaps.append(len(active))
+        sleep(0.01)
+        active.pop()
+        return coordinator.run(lambda: 'nested')
+
+    results = []
+
+    def worker():
+        with coordinator.slot():
+            results.append(write())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert max(overlaps) == 1, 'Убедитесь, что записи идут по одной.'
+    assert results == ['nested'] * 4
+    assert coordinator.stats()['depth'] == 0
+
+
+def test_full_queue_is_rejected():
+    coordinator = WriteCoordinator(
+        {**CONFIG, 'MAX_PENDING': 1, 'QUEUE_TIMEOUT': 0.01})
+    entered = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with coordinator.slot():
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    entered.wait()
+    with pytest.raises(WriteQueueFull):
+        with coordinator.slot():
+            pass
+    release.set()
+    thread.join()
+    assert coordinator.stats()['rejected'] == 1
+
+
+def test_long_writer_does_not_hold_queue_past_timeout():
+    coordinator = WriteCoordinator(
+        {**CONFIG, 'MAX_PENDING': 2, 'QUEUE_TIMEOUT': 0.05})
+    entered = threading.Event()
+    release = threading.Event()
+
+    def long_writer():
+        with coordinator.slot():
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=long_writer)
+    thread.start()
+    entered.wait()
+    try:
+        started = perf_counter()
+        with pytest.raises(WriteQueueFull):
+            with coordinator.slot():
+                pass
+        assert perf_counter() - started < 1, (
+            'Убедитесь, что ожидание права записи ограничено '
+            'QUEUE_TIMEOUT.'
+        )
+    finally:
+        release.set()
+        thread.join()
+    stats = coordinator.stats()
+    assert (stats['rejected'], stats['depth']) == (1, 0)
+    # Место в очереди после отказа освобождено.
+    with coordinator.slot():
+        pass
+
+
+def test_disabled_by_default():
+    assert get_write_coordinator() is None
+
+
+def test_comment_goes_through_queue(
+        settings, user_client, post_with_published_location, metrics_auth):
+    settings.WRITE_COORDINATOR = CONFIG
+    coordinator = get_write_coordinator()
+    post = post_with_published_location
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Через очередь'})
+    assert response.status_code == 302
+    assert Comment.objects.filter(text='Через очередь').exists()
+    assert coordinator.stats()['writes'] >= 1
+    metrics = user_client.get('/metrics/', **metrics_auth).content.decode()
+    assert 'blog_write_queue_writes_total' in metrics
+    writes = coordinator.stats()['writes']
+    user_client.get(f'/posts/{post.id}/')
+    assert coordinator.stats()['writes'] == writes, (
+        'Убедитесь, что чтение не проходит через очередь записи.'
+    )
+
+
+@pytest.fixture
+def coordinator(settings):
+    settings.WRITE_COORDINATOR = CONFIG
+    return get_write_coordinator()
+
+
+def test_backend_coordinates_writes_without_signals(coordinator, tmp_path):
+    # Соединение, открытое в обход обработчиков приложения.
+    wrapper = DatabaseWrapper({
+        **connection.settings_dict,
+        'NAME': str(tmp_path / 'db.sqlite3'),
+        'POOL': None,
+    }, alias='no_signals')
+    assert wrapper.execute_wrappers == [coordinate_writes]
+    writes = coordinator.stats()['writes']
+    try:
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE note (text TEXT)')
+            cursor.execute("INSERT INTO note VALUES ('x')")
+            cursor.execute('SELECT * FROM note')
+    finally:
+        wrapper.close()
+    assert coordinator.stats()['writes'] == writes + 1
+
+
+def _post_comment(client, post, text):
+    return client.post(f'/posts/{post.id}/comment/', {'text': text})
+
+
+@pytest.mark.django_db(transaction=True)
+def test_view_code_runs_outside_queue(
+        coordinator, monkeypatch, user_client, post_with_published_location):
+    held = []
+    clean = CommentForm.clean
+
+    def spy(form):
+        held.append(coordinator.in_write())
+        return clean(form)
+
+    monkeypatch.setattr(CommentForm, 'clean', spy)
+    response = _post_comment(
+        user_client, post_with_published_location, 'Вне очереди')
+    assert response.status_code == 302
+    assert held == [False], (
+        'Убедитесь, что очередь записи не держится, пока работает '
+        'код представления.'
+    )
+    assert coordinator.stats()['writes'] >= 1
+
+
+def _locked_once(table):
+    failures = []
+
+    def wrapper(execute, sql, params, many, context):
+        if table in sql and not failures:
+            failures.append(1)
+            raise OperationalError('database is locked')
+        return execute(sql, params, many, context)
+
+    return wrapper
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_statement_is_retried(
+        coordinator, post_with_published_location):
+    post = post_with_published_location
+    retries = coordinator.stats()['retries']
+    with connection.execute_wrapper(_locked_once('UPDATE "blog_post"')):
+        type(post).objects.filter(pk=post.pk).update(title='Повтор')
+    post.refresh_from_db()
+    assert post.title == 'Повтор'
+    assert coordinator.stats()['retries'] == retries + 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_locked_view_is_not_rerun(
+        coordinator, monkeypatch, user_client, post_with_published_location):
+    calls = []
+    clean = CommentForm.clean
+    monkeypatch.setattr(
+        CommentForm, 'clean', lambda form: calls.append(1) or clean(form))
+    locked = _locked_once('INSERT INTO "blog_comment"')
+    retries = coordinator.stats()['retries']
+    with connection.execute_wrapper(locked), pytest.raises(
+            OperationalError):
+        _post_comment(user_client, post_with_published_location, 'Повтор')
+    assert len(calls) == 1, (
+        'Убедитесь, что при блокировке представление не выполняется '
+        'повторно.'
+    )
+    assert coordinator.stats()['retries'] == retries
+    assert not coordinator.in_write()
+    assert not Comment.objects.filter(text='Повтор').exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_queue_is_held_until_transaction_ends(
+        coordinator, post_with_published_location):
+    post = post_with_published_location
+    writes = coordinator.stats()['writes']
+    with transaction.atomic():
+        type(post).objects.filter(pk=post.pk).update(title='Первая')
+        assert coordinator.in_write()
+        type(post).objects.filter(pk=post.pk).update(title='Вторая')
+    assert not coordinator.in_write()
+    assert coordinator.stats()['writes'] == writes + 1
+    with pytest.raises(ValueError):
+        with transaction.atomic():
+            type(post).objects.filter(pk=post.pk).update(title='Откат')
+            raise ValueError
+    assert not coordinator.in_write()
+    thread = threading.Thread(target=lambda: coordinator.slot().__enter__())
+    thread.start()
+    thread.join(1)
+    assert not thread.is_alive(), 'Убедитесь, что очередь освобождается.'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_full_queue_returns_503(
+        settings, user_client, post_with_published_location):
+    settings.WRITE_COORDINATOR = {
+        **CONFIG, 'MAX_PENDING': 1, 'QUEUE_TIMEOUT': 0.01}
+    coordinator = get_write_coordinator()
+    entered = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with coordinator.slot():
+            entered.set()
+            release.wait()
+
+    thread = threading.Thread(target=holder)
+    thread.start()
+    entered.wait()
+    try:
+        response = _post_comment(
+            user_client, post_with_published_location, 'Не дождался')
+    finally:
+        release.set()
+        thread.join()
+    assert response.status_code == 503
+    assert response['Retry-After'] == '1'